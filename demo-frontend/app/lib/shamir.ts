@@ -12,16 +12,29 @@ const BN254_P =
 
 interface ShareCoefficient {
   x: number;
-  y: string; // hex string
+  y: string; // hex string, or base64 of 32 big-endian bytes when y_encoding = "base64"
 }
 
 interface ShareFile {
   share_index: number;
   threshold: number;
   num_shares: number;
+  y_encoding?: "hex" | "base64"; // absent in older share files (hex)
   coefficients: ShareCoefficient[];
 }
 
+// Decode a share y value according to the file's y_encoding
+function decodeShareY(y: string, encoding: ShareFile["y_encoding"]): bigint {
+  if (encoding !== "base64") {
+    return BigInt(y);
+  }
+  let value = 0n;
+  for (const ch of atob(y)) {
+    value = (value << 8n) | BigInt(ch.charCodeAt(0));
+  }
+  return value;
+}
+
 // Modular exponentiation for BigInt
 function modPow(base: bigint, exp: bigint, mod: bigint): bigint {
   let result = 1n;
@@ -104,11 +117,11 @@ export async function reconstructSk(
   for (let coeffIdx = 0; coeffIdx < N; coeffIdx++) {
     const s1: [number, bigint] = [
       share1Data.coefficients[coeffIdx].x,
-      BigInt(share1Data.coefficients[coeffIdx].y),
+      decodeShareY(share1Data.coefficients[coeffIdx].y, share1Data.y_encoding),
     ];
     const s2: [number, bigint] = [
       share2Data.coefficients[coeffIdx].x,
-      BigInt(share2Data.coefficients[coeffIdx].y),
+      decodeShareY(share2Data.coefficients[coeffIdx].y, share2Data.y_encoding),
     ];
     const val = shamirReconstructField([s1, s2], threshold);
     // Convert BN254 → signed → mod q
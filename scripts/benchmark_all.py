@@ -4,17 +4,32 @@
   2. var PK + e as witness
   3. const PK + e computed (no e witness)
   4. var PK + e computed (no e witness)
+plus variant 1 again with the owner key derived through a 32x256 fixed-base
+table instead of fixed_base_scalar_mul, to compare the two derivations.
 
 All use q=167772161, Delta=655360, MSG_SLOTS=64, N=1024.
 """
 import os
+import argparse
 import subprocess
 import random
-import re
 import json
 import math
 import time
 import shutil
+import hashlib
+import struct
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from build_cache import nargo_compile_cached, nargo_version, write_if_changed
+from grumpkin import GRUMPKIN_G, grumpkin_add
+from nargo_output import CIRCUIT_OUT_RE, CIRCUIT_OUT_TRIPLE_RE, NB_CONSTRAINTS_RE, nargo_execute_search, run_search
+from negacyclic_ntt import negacyclic_mul_ntt_many
+from noir_snippets import RANGE_PROOF_SIGNED_BATCH
 
 N = 1024
 RLWE_Q = 167772161
@@ -32,35 +47,35 @@ KEYS_DIR = os.path.join(PROJ_DIR, "demo-frontend", "public", "rlwe")
 NARGO = os.path.expanduser("~/.nargo/bin/nargo")
 SUNSPOT = os.path.expanduser("~/gopath/bin/sunspot")
 
+# At most this many variants are inside the sunspot setup/prove/verify stages at a
+# time. 1 unless main(parallel=True), so timed runs never overlap those stages; with
+# --parallel the cap only bounds peak RAM, since Groth16 setup and proving are the
+# heaviest steps.
+MAX_CONCURRENT_PROVERS = 1
+PARALLEL_MAX_CONCURRENT_PROVERS = 2
+_SUNSPOT_PROVER_SLOTS = threading.BoundedSemaphore(MAX_CONCURRENT_PROVERS)
+
+# Helper circuit outputs, kept across runs; see cached_helper_output
+HELPER_CACHE_FILE = os.path.join(".cache", "helper_outputs.json")
+_HELPER_CACHE_LOCK = threading.Lock()
 
-def negacyclic_mul_mod_q(a, b, n, q):
-    result = [0] * n
-    for i in range(n):
-        for j in range(n):
-            idx = i + j
-            if idx < n:
-                result[idx] = (result[idx] + a[i] * b[j]) % q
-            else:
-                result[idx - n] = (result[idx - n] - a[i] * b[j]) % q
-    return result
 
+def negacyclic_mul_signed(a, b, n):
+    """Exact integer a * b mod (X^n + 1), without reducing mod q, as an int64 array.
 
-def negacyclic_matrix_row_mod_q(poly, k, n, q):
-    row = [0] * n
-    for j in range(n):
-        idx = k - j
-        if idx >= 0:
-            row[j] = poly[idx] % q
-        else:
-            row[j] = (-poly[idx + n]) % q
-    return row
+    Coefficient k equals the circuits' <row_k(a), b> with wrapped terms negated,
+    which is what the k0/k1 quotients must be taken against. Callers keep the
+    products below 2^63 (here |a| < q, |b| <= 3).
+    """
+    full = np.convolve(np.asarray(a, dtype=np.int64), np.asarray(b, dtype=np.int64))
+    out = full[:n].copy()
+    out[:n - 1] -= full[n:]
+    return out
 
 
 def encode_field_to_bytes(value, num_bytes=32):
-    slots = []
-    for i in range(num_bytes):
-        slots.append((value >> (i * 8)) & 0xFF)
-    return slots
+    # Masking keeps negative or oversized values byte-compatible with the old shift-and-mask loop
+    return list((value & ((1 << (8 * num_bytes)) - 1)).to_bytes(num_bytes, "little"))
 
 
 def format_field(v):
@@ -77,21 +92,49 @@ def format_field_noir(v):
     return f'0x{v:064x}'
 
 
+_FMT_FIELD = '"0x%064x"'.__mod__
+_FMT_FIELD_NOIR = '0x%064x'.__mod__
+
+
+def format_field_array(values):
+    """Comma-separated format_field(v) for each value (one list comp, so str.join can presize)."""
+    return ", ".join([_FMT_FIELD(x) if (x := v % BN254_P) else '"0"' for v in values])
+
+
+def format_field_noir_array(values):
+    """Comma-separated format_field_noir(v) for each value."""
+    return ", ".join([_FMT_FIELD_NOIR(x) if (x := v % BN254_P) else '0' for v in values])
+
+
+def _parse_hex_u32(values):
+    """Parse "0x%08x" strings (rlwe_keygen's to_hex_q format) with one bytes.fromhex call.
+
+    The fast path applies only when every value is exactly "0x" + 8 digits: each
+    "x" of the joined string then sits at offset 1 mod 10. Anything else goes
+    through per-element int(v, 16).
+    """
+    n = len(values)
+    joined = "".join(values)
+    if len(joined) == 10 * n and joined.count("x") == n and joined[1::10].count("x") == n:
+        try:
+            return struct.unpack(f">{n}I", bytes.fromhex(joined.replace("0x", "")))
+        except ValueError:
+            pass
+    return tuple(int(v, 16) for v in values)
+
+
+@functools.lru_cache(maxsize=1)
 def load_rlwe_pk():
+    """Parse rlwe_pk.json once per run; returns (a, b) as tuples so the cached copy stays intact."""
     pk_path = os.path.join(KEYS_DIR, "rlwe_pk.json")
     with open(pk_path) as f:
         data = json.load(f)
-    a = [int(v, 16) for v in data["a"]]
-    b = [int(v, 16) for v in data["b"]]
+    a = _parse_hex_u32(data["a"])
+    b = _parse_hex_u32(data["b"])
     return a, b
 
 
-def run_bjj_helper_poseidon1(secret_key):
-    helper_dir = os.path.join(PROJ_DIR, "bjj_helper_p1")
-    os.makedirs(os.path.join(helper_dir, "src"), exist_ok=True)
-
-    with open(os.path.join(helper_dir, "Nargo.toml"), "w") as f:
-        f.write("""[package]
+_BJJ_HELPER_NARGO_TOML = """[package]
 name = "bjj_helper_p1"
 type = "bin"
 authors = [""]
@@ -99,10 +142,8 @@ compiler_version = ">=0.39.0"
 
 [dependencies]
 poseidon = { tag = "v0.1.1", git = "https://github.com/noir-lang/poseidon" }
-""")
-
-    with open(os.path.join(helper_dir, "src", "main.nr"), "w") as f:
-        f.write("""use dep::poseidon::poseidon::bn254::hash_2 as poseidon_hash;
+"""
+_BJJ_HELPER_MAIN_NR = """use dep::poseidon::poseidon::bn254::hash_2 as poseidon_hash;
 use std::embedded_curve_ops::{EmbeddedCurveScalar, fixed_base_scalar_mul};
 
 fn main(secret_key: Field) -> pub (Field, Field, Field) {
@@ -114,44 +155,117 @@ fn main(secret_key: Field) -> pub (Field, Field, Field) {
     let wa = poseidon_hash([pk.x, pk.y]);
     (pk.x, pk.y, wa)
 }
-""")
-
-    with open(os.path.join(helper_dir, "Prover.toml"), "w") as f:
-        f.write(f'secret_key = "{secret_key}"\n')
+"""
 
-    subprocess.run([NARGO, "compile"], cwd=helper_dir, check=True, capture_output=True)
-    result = subprocess.run([NARGO, "execute"], cwd=helper_dir, check=True, capture_output=True, text=True)
-    output = result.stdout + result.stderr
 
-    match = re.search(r'Circuit output:\s*\((0x[0-9a-fA-F]+),\s*(0x[0-9a-fA-F]+),\s*(0x[0-9a-fA-F]+)\)', output)
-    if not match:
-        raise RuntimeError(f"Could not parse bjj_helper_p1 output: {output}")
+@functools.lru_cache(maxsize=None)
+def helper_package(package_dir, package_name, nargo_toml, main_nr):
+    """Set up a persistent helper package once per run: sources written and compiled.
 
-    return int(match.group(1), 16), int(match.group(2), 16), int(match.group(3), 16)
+    Later invocations only rewrite Prover.toml and run `nargo execute`.
+    """
+    os.makedirs(os.path.join(package_dir, "src"), exist_ok=True)
+    write_if_changed(os.path.join(package_dir, "Nargo.toml"), nargo_toml)
+    write_if_changed(os.path.join(package_dir, "src", "main.nr"), main_nr)
+    nargo_compile_cached(NARGO, package_dir, package_name, nargo_toml + main_nr, capture_output=True)
+    return package_dir
 
 
-def run_ct_helper_v2(c0_sparse, c1):
-    helper_dir = os.path.join(PROJ_DIR, "ct_helper_v2")
-    os.makedirs(os.path.join(helper_dir, "src"), exist_ok=True)
-
-    with open(os.path.join(helper_dir, "Nargo.toml"), "w") as f:
-        f.write("""[package]
+def _read_helper_cache(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def cached_helper_output(nargo_toml, main_nr, prover_toml, compute):
+    """Return compute()'s tuple of ints, memoized on disk across runs.
+
+    Keyed by the sha256 of `nargo --version` and the helper's Nargo.toml, main.nr
+    and Prover.toml, so a changed toolchain, dependency, circuit or input misses.
+    Hits skip the helper's nargo compile and execute entirely.
+    """
+    key = hashlib.sha256("\0".join([nargo_version(NARGO), nargo_toml, main_nr, prover_toml]).encode()).hexdigest()
+    path = os.path.join(PROJ_DIR, HELPER_CACHE_FILE)
+    with _HELPER_CACHE_LOCK:
+        hit = _read_helper_cache(path).get(key)
+    if hit is not None:
+        return tuple(int(v, 16) for v in hit)
+
+    values = compute()
+
+    with _HELPER_CACHE_LOCK:
+        cache = _read_helper_cache(path)
+        cache[key] = [hex(v) for v in values]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "w") as f:
+            json.dump(cache, f, indent=1)
+        os.replace(path + ".tmp", path)
+    return values
+
+
+@functools.lru_cache(maxsize=16)
+def run_bjj_helper_poseidon1(secret_key):
+    """(pk_x, pk_y, wa_commitment) for secret_key; memoized, the helper circuit is deterministic."""
+    prover_toml = f'secret_key = "{secret_key}"\n'
+
+    def execute():
+        helper_dir = helper_package(os.path.join(PROJ_DIR, "bjj_helper_p1"), "bjj_helper_p1",
+                                    _BJJ_HELPER_NARGO_TOML, _BJJ_HELPER_MAIN_NR)
+        write_if_changed(os.path.join(helper_dir, "Prover.toml"), prover_toml)
+        match = nargo_execute_search(NARGO, helper_dir, CIRCUIT_OUT_TRIPLE_RE)
+        return int(match.group(1), 16), int(match.group(2), 16), int(match.group(3), 16)
+
+    return cached_helper_output(_BJJ_HELPER_NARGO_TOML, _BJJ_HELPER_MAIN_NR, prover_toml, execute)
+
+
+# Poseidon2 rate-3 sponge over packed[0..TOTAL_PACKED], shared by ct_helper_v2 and the
+# variant circuits. FULL_ROUNDS/REMAINDER are fixed at codegen time, so the tail block
+# is only emitted (and REMAINDER only consulted) here in Python. As in
+# poseidon2_bn254.sponge_rate3 and the audit circuit, the final permutation always
+# runs, even when the tail block is empty.
+FULL_ROUNDS, REMAINDER = divmod(TOTAL_PACKED, 3)
+
+
+def ct_sponge_noir(total_packed=TOTAL_PACKED):
+    """Noir body of the sponge; expects `packed` and a FULL_ROUNDS global of total_packed // 3."""
+    remainder = total_packed % 3
+    tail = []
+    if remainder >= 1:
+        tail.append("    state[0] += packed[FULL_ROUNDS * 3];")
+    if remainder >= 2:
+        tail.append("    state[1] += packed[FULL_ROUNDS * 3 + 1];")
+    return "\n".join([
+        "    let mut state: [Field; 4] = [0; 4];",
+        "    for i in 0..FULL_ROUNDS {",
+        "        state[0] += packed[3 * i];",
+        "        state[1] += packed[3 * i + 1];",
+        "        state[2] += packed[3 * i + 2];",
+        "        state = poseidon2_permutation(state, 4);",
+        "    }",
+        *tail,
+        "    state = poseidon2_permutation(state, 4);",
+        "    state[0]",
+    ])
+
+
+_CT_HELPER_NARGO_TOML = """[package]
 name = "ct_helper_v2"
 type = "bin"
 authors = [""]
 compiler_version = ">=0.39.0"
 
 [dependencies]
-""")
-
-    with open(os.path.join(helper_dir, "src", "main.nr"), "w") as f:
-        f.write(f"""use std::hash::poseidon2_permutation;
+"""
+_CT_HELPER_MAIN_NR = f"""use std::hash::poseidon2_permutation;
 
 global N: u32 = {N};
 global MSG_SLOTS: u32 = {MSG_SLOTS};
 global PACKED_C0: u32 = {PACKED_C0};
 global PACKED_C1: u32 = {PACKED_C1};
 global TOTAL_PACKED: u32 = {TOTAL_PACKED};
+global FULL_ROUNDS: u32 = {FULL_ROUNDS};
 
 fn pack_7_from_sparse(arr: [Field; MSG_SLOTS], offset: u32) -> Field {{
     let mut packed: Field = 0;
@@ -186,208 +300,265 @@ fn main(c0_sparse: [Field; MSG_SLOTS], c1: [Field; N]) -> pub Field {{
         packed[PACKED_C0 + i] = pack_7_from_full(c1, i * 7);
     }}
 
-    let mut state: [Field; 4] = [0; 4];
-    let full_rounds: u32 = TOTAL_PACKED / 3;
-    for i in 0..full_rounds {{
-        state[0] += packed[3 * i];
-        state[1] += packed[3 * i + 1];
-        state[2] += packed[3 * i + 2];
-        state = poseidon2_permutation(state, 4);
-    }}
-    let remainder = TOTAL_PACKED - full_rounds * 3;
-    if remainder >= 1 {{
-        state[0] += packed[full_rounds * 3];
-    }}
-    if remainder >= 2 {{
-        state[1] += packed[full_rounds * 3 + 1];
-    }}
-    state = poseidon2_permutation(state, 4);
-    state[0]
+{ct_sponge_noir()}
 }}
-""")
+"""
+
+
+def run_ct_helper_v2(c0_sparse, c1):
+    """Poseidon2 ct_commitment of (c0_sparse, c1); memoized on the coefficient tuples."""
+    return _run_ct_helper_v2_cached(tuple(c0_sparse), tuple(c1))
 
-    with open(os.path.join(helper_dir, "Prover.toml"), "w") as f:
-        f.write(f"c0_sparse = [{', '.join(format_field(v) for v in c0_sparse)}]\n")
-        f.write(f"c1 = [{', '.join(format_field(v) for v in c1)}]\n")
 
-    subprocess.run([NARGO, "compile"], cwd=helper_dir, check=True, capture_output=True)
-    result = subprocess.run([NARGO, "execute"], cwd=helper_dir, check=True, capture_output=True, text=True)
-    output = result.stdout + result.stderr
+@functools.lru_cache(maxsize=16)
+def _run_ct_helper_v2_cached(c0_sparse, c1):
+    prover_toml = "".join([
+        "c0_sparse = [", format_field_array(c0_sparse), "]\n",
+        "c1 = [", format_field_array(c1), "]\n",
+    ])
 
-    match = re.search(r'Circuit output:\s*(0x[0-9a-fA-F]+)', output)
-    if not match:
-        raise RuntimeError(f"Could not parse ct_helper_v2 output: {output}")
+    def execute():
+        helper_dir = helper_package(os.path.join(PROJ_DIR, "ct_helper_v2"), "ct_helper_v2",
+                                    _CT_HELPER_NARGO_TOML, _CT_HELPER_MAIN_NR)
+        write_if_changed(os.path.join(helper_dir, "Prover.toml"), prover_toml)
+        match = nargo_execute_search(NARGO, helper_dir, CIRCUIT_OUT_RE)
+        return (int(match.group(1), 16),)
 
-    return int(match.group(1), 16)
+    return cached_helper_output(_CT_HELPER_NARGO_TOML, _CT_HELPER_MAIN_NR, prover_toml, execute)[0]
+
+
+FIXED_BASE_WINDOWS = 32  # 8-bit windows covering a 254-bit scalar
+
+
+@functools.lru_cache(maxsize=1)
+def fixed_base_table():
+    """table[i][b] = b * 256^i * G, so k * G = sum_i table[i][byte_i(k)]."""
+    table = []
+    base = GRUMPKIN_G
+    for _ in range(FIXED_BASE_WINDOWS):
+        row = [None]
+        for _ in range(255):
+            row.append(grumpkin_add(row[-1], base))
+        table.append(row)
+        base = grumpkin_add(row[-1], base)  # 256 * base
+    return table
+
+
+@functools.lru_cache(maxsize=1)
+def fixed_base_table_noir():
+    """BASE_TABLE global for derive_pk(), formatted once and shared by all variants."""
+    def point(pt):
+        if pt is None:
+            return "EmbeddedCurvePoint { x: 0, y: 0, is_infinite: true }"
+        return f"EmbeddedCurvePoint {{ x: {format_field_noir(pt[0])}, y: {format_field_noir(pt[1])}, is_infinite: false }}"
+    rows = ",\n".join("    [" + ", ".join([point(pt) for pt in row]) + "]" for row in fixed_base_table())
+    return f"global BASE_TABLE: [[EmbeddedCurvePoint; 256]; {FIXED_BASE_WINDOWS}] = [\n{rows}\n];\n"
 
 
 # ============================================================
-# Circuit generation functions for 4 variants
+# Circuit generation functions for the variants
 # ============================================================
 
-def circuit_common_header():
+def circuit_common_header(base_table=False):
+    curve_ops = "embedded_curve_add" if base_table else "EmbeddedCurveScalar, fixed_base_scalar_mul"
     return f"""use dep::poseidon::poseidon::bn254::hash_2 as poseidon1_hash_2;
 use std::hash::poseidon2_permutation;
-use std::embedded_curve_ops::{{EmbeddedCurveScalar, fixed_base_scalar_mul}};
+use std::embedded_curve_ops::{{EmbeddedCurvePoint, {curve_ops}}};
 
 global N: u32 = {N};
 global MSG_SLOTS: u32 = {MSG_SLOTS};
 global PACKED_C0: u32 = {PACKED_C0};
 global PACKED_C1: u32 = {PACKED_C1};
 global TOTAL_PACKED: u32 = {TOTAL_PACKED};
+global FULL_ROUNDS: u32 = {FULL_ROUNDS};
+global MSG_SLOTS_PADDED: u32 = {PACKED_C0 * 7};
+global N_PADDED: u32 = {PACKED_C1 * 7};
 global RLWE_Q: Field = {RLWE_Q};
 global DELTA: Field = {DELTA};
+global SHIFTS_7: [Field; 7] = [{", ".join(hex(1 << (32 * j)) for j in range(7))}];
+"""
+
+
+def derive_pk_noir(base_table=False):
+    """derive_pk(secret_key) = secret_key * G, via fixed_base_scalar_mul or BASE_TABLE."""
+    if not base_table:
+        return """fn derive_pk(secret_key: Field) -> EmbeddedCurvePoint {
+    let two_pow_128: Field = 0x100000000000000000000000000000000;
+    let secret_low = secret_key as u128;
+    let secret_high = ((secret_key - secret_low as Field) / two_pow_128) as u128;
+    let scalar = EmbeddedCurveScalar::new(secret_low as Field, secret_high as Field);
+    fixed_base_scalar_mul(scalar)
+}
+"""
+    return f"""{fixed_base_table_noir()}
+// secret_key * G as one table lookup per scalar byte plus 31 additions. to_le_bytes
+// is canonical, so k = secret_key < BN254_P < the Grumpkin order. After window i the
+// partial sum is (k mod 256^i) * G and the next addend b * 256^i * G, with
+// k mod 256^i < 256^i <= b * 256^i <= k for b != 0: both scalars are distinct and
+// below the order, and so is their nonzero sum, so no addition is a doubling or
+// P + (-P). Zero bytes select the point at infinity, which embedded_curve_add
+// handles.
+fn derive_pk(secret_key: Field) -> EmbeddedCurvePoint {{
+    let bytes: [u8; 32] = secret_key.to_le_bytes();
+    let mut pk = BASE_TABLE[0][bytes[0] as u32];
+    for i in 1..32 {{
+        pk = embedded_curve_add(pk, BASE_TABLE[i][bytes[i] as u32]);
+    }}
+    pk
+}}
 """
 
 
-def circuit_helper_fns():
+def circuit_helper_fns(base_table=False):
     return f"""
-fn inner_product(a: [Field; N], b: [Field; N]) -> Field {{
-    let mut sum: Field = 0;
-    for i in 0..N {{ sum += a[i] * b[i]; }}
-    sum
+{derive_pk_noir(base_table)}
+// init[k] - (a * b)[k] mod (X^N + 1) for both BGV equations at once: row k of the
+// negacyclic matrix of a, taken against b without materializing the rows, and
+// subtracted straight into each constraint's residual. The first MSG_SLOTS rows of
+// the c0 and c1 equations share the same b[j] and sign, so they go in one pass.
+fn negacyclic_mul_sub_pair(
+    init0: [Field; MSG_SLOTS],
+    a0: [Field; N],
+    init1: [Field; N],
+    a1: [Field; N],
+    b: [Field; N],
+) -> ([Field; MSG_SLOTS], [Field; N]) {{
+    let mut out0: [Field; MSG_SLOTS] = [0; MSG_SLOTS];
+    let mut out1: [Field; N] = [0; N];
+    for k in 0..MSG_SLOTS {{
+        let mut acc0: Field = init0[k];
+        let mut acc1: Field = init1[k];
+        for j in 0..N {{
+            if j <= k {{
+                acc0 -= a0[k - j] * b[j];
+                acc1 -= a1[k - j] * b[j];
+            }} else {{
+                acc0 += a0[N + k - j] * b[j];
+                acc1 += a1[N + k - j] * b[j];
+            }}
+        }}
+        out0[k] = acc0;
+        out1[k] = acc1;
+    }}
+    for k in MSG_SLOTS..N {{
+        let mut acc1: Field = init1[k];
+        for j in 0..N {{
+            if j <= k {{
+                acc1 -= a1[k - j] * b[j];
+            }} else {{
+                acc1 += a1[N + k - j] * b[j];
+            }}
+        }}
+        out1[k] = acc1;
+    }}
+    (out0, out1)
 }}
 
-fn pack_7_from_sparse(arr: [Field; MSG_SLOTS], offset: u32) -> Field {{
+// Inputs are zero-padded to a multiple of 7 so every limb is in bounds
+fn pack_7_from_sparse(arr: [Field; MSG_SLOTS_PADDED], offset: u32) -> Field {{
     let mut packed: Field = 0;
-    let mut shift: Field = 1;
     for j in 0..7 {{
-        if offset + j < MSG_SLOTS {{
-            packed += arr[offset + j] * shift;
-        }}
-        shift *= 0x100000000;
+        packed += arr[offset + j] * SHIFTS_7[j];
     }}
     packed
 }}
 
-fn pack_7_from_full(arr: [Field; N], offset: u32) -> Field {{
+fn pack_7_from_full(arr: [Field; N_PADDED], offset: u32) -> Field {{
     let mut packed: Field = 0;
-    let mut shift: Field = 1;
     for j in 0..7 {{
-        if offset + j < N {{
-            packed += arr[offset + j] * shift;
-        }}
-        shift *= 0x100000000;
+        packed += arr[offset + j] * SHIFTS_7[j];
     }}
     packed
 }}
 
 fn compute_ct_commitment_packed(c0_sparse: [Field; MSG_SLOTS], c1: [Field; N]) -> Field {{
+    let mut c0_padded: [Field; MSG_SLOTS_PADDED] = [0; MSG_SLOTS_PADDED];
+    for i in 0..MSG_SLOTS {{ c0_padded[i] = c0_sparse[i]; }}
+    let mut c1_padded: [Field; N_PADDED] = [0; N_PADDED];
+    for i in 0..N {{ c1_padded[i] = c1[i]; }}
+
     let mut packed: [Field; TOTAL_PACKED] = [0; TOTAL_PACKED];
     for i in 0..PACKED_C0 {{
-        packed[i] = pack_7_from_sparse(c0_sparse, i * 7);
+        packed[i] = pack_7_from_sparse(c0_padded, i * 7);
     }}
     for i in 0..PACKED_C1 {{
-        packed[PACKED_C0 + i] = pack_7_from_full(c1, i * 7);
+        packed[PACKED_C0 + i] = pack_7_from_full(c1_padded, i * 7);
     }}
 
-    let mut state: [Field; 4] = [0; 4];
-    let full_rounds: u32 = TOTAL_PACKED / 3;
-    for i in 0..full_rounds {{
-        state[0] += packed[3 * i];
-        state[1] += packed[3 * i + 1];
-        state[2] += packed[3 * i + 2];
-        state = poseidon2_permutation(state, 4);
-    }}
-    let remainder = TOTAL_PACKED - full_rounds * 3;
-    if remainder >= 1 {{
-        state[0] += packed[full_rounds * 3];
-    }}
-    if remainder >= 2 {{
-        state[1] += packed[full_rounds * 3 + 1];
-    }}
-    state = poseidon2_permutation(state, 4);
-    state[0]
+{ct_sponge_noir()}
 }}
 
 fn encode_field_to_byte_slots(value: Field) -> [Field; 32] {{
-    let bits: [u1; 254] = value.to_le_bits();
+    let bytes: [u8; 32] = value.to_le_bytes();
     let mut slots: [Field; 32] = [0; 32];
     for i in 0..32 {{
-        let mut slot_value: Field = 0;
-        let mut power: Field = 1;
-        let start = i * 8;
-        for j in 0..8 {{
-            let bit_index = start + j;
-            if bit_index < 254 {{
-                if bits[bit_index] == 1 {{
-                    slot_value = slot_value + power;
-                }}
-            }}
-            power = power * 2;
-        }}
-        slots[i] = slot_value;
+        slots[i] = bytes[i] as Field;
     }}
     slots
 }}
 
-fn range_proof_signed(value: Field) {{
-    let shifted = value + 128;
-    let _ = shifted as u8;
-}}
-"""
+{RANGE_PROOF_SIGNED_BATCH}"""
 
 
-def gen_circuit_const_e_witness(pk_b_rows, pk_a_rows):
-    """Variant 1: const PK, e1/e2 as witness"""
-    pk_b_block = ',\n'.join(
-        f"    [{', '.join(format_field_noir(v) for v in row)}]" for row in pk_b_rows)
-    pk_a_block = ',\n'.join(
-        f"    [{', '.join(format_field_noir(v) for v in row)}]" for row in pk_a_rows)
+@functools.lru_cache(maxsize=1)
+def const_pk_globals(pk_b, pk_a):
+    """PK_B/PK_A globals for the const-PK variants, formatted once for both of them.
 
-    return f"""// Variant 1: const PK + e as witness
-{circuit_common_header()}
+    PK coefficients are already in [0, q), so they are emitted as plain decimal
+    literals: no BN254 reduction, and at most 9 digits instead of 66 hex chars.
+    """
+    return f"""global PK_B: [Field; N] = [{", ".join(map(str, pk_b))}];
 
-global PK_B_ROWS: [[Field; N]; MSG_SLOTS] = [
-{pk_b_block}
-];
+global PK_A: [Field; N] = [{", ".join(map(str, pk_a))}];
+"""
 
-global PK_A_ROWS: [[Field; N]; N] = [
-{pk_a_block}
-];
 
-{circuit_helper_fns()}
+def circuit_main(pk_b_src, pk_a_src, e_witness, var_pk):
+    """main() shared by all variants.
 
-fn main(
+    e1/e2 are always derived from the public values + quotient witness and
+    range-checked once. The e-witness variants additionally take e1_sparse/e2
+    as inputs and only tie them to the derived values.
+    """
+    e_params = """
+    e1_sparse: [Field; MSG_SLOTS],
+    e2: [Field; N],""" if e_witness else ""
+    pk_params = """
+    pk_b: [Field; N],
+    pk_a: [Field; N],""" if var_pk else ""
+    e1_tie = """
+    for i in 0..MSG_SLOTS { assert(calculated_e1[i] == e1_sparse[i]); }""" if e_witness else ""
+    e2_tie = """
+    for i in 0..N { assert(calculated_e2[i] == e2[i]); }""" if e_witness else ""
+    return f"""fn main(
     wa_commitment: pub Field,
     ct_commitment: pub Field,
     c0_sparse: pub [Field; MSG_SLOTS],
     c1: pub [Field; N],
     secret_key: Field,
-    r: [Field; N],
-    e1_sparse: [Field; MSG_SLOTS],
-    e2: [Field; N],
+    r: [Field; N],{e_params}
     k0: [Field; MSG_SLOTS],
-    k1: [Field; N],
+    k1: [Field; N],{pk_params}
 ) {{
-    let two_pow_128: Field = 0x100000000000000000000000000000000;
-    let secret_low = secret_key as u128;
-    let secret_high = ((secret_key - secret_low as Field) / two_pow_128) as u128;
-    let scalar = EmbeddedCurveScalar::new(secret_low as Field, secret_high as Field);
-    let pk = fixed_base_scalar_mul(scalar);
+    let pk = derive_pk(secret_key);
 
     let calculated_wa = poseidon1_hash_2([pk.x, pk.y]);
     assert(wa_commitment == calculated_wa);
 
-    let mut msg: [Field; MSG_SLOTS] = [0; MSG_SLOTS];
-    let slots_x = encode_field_to_byte_slots(pk.x);
-    for i in 0..32 {{ msg[i] = slots_x[i]; }}
-    let slots_y = encode_field_to_byte_slots(pk.y);
-    for i in 0..32 {{ msg[32 + i] = slots_y[i]; }}
+    // MSG_SLOTS == 64: owner_x bytes then owner_y bytes
+    let msg: [Field; MSG_SLOTS] = encode_field_to_byte_slots(pk.x).concat(encode_field_to_byte_slots(pk.y));
 
-    for i in 0..N {{ range_proof_signed(r[i]); }}
-    for i in 0..MSG_SLOTS {{ range_proof_signed(e1_sparse[i]); }}
-    for i in 0..N {{ range_proof_signed(e2[i]); }}
+    range_proof_signed_batch(r);
 
-    for i in 0..MSG_SLOTS {{
-        let ip = inner_product(PK_B_ROWS[i], r);
-        assert(c0_sparse[i] + k0[i] * RLWE_Q == ip + e1_sparse[i] + DELTA * msg[i]);
-    }}
+    // e1 = c0 + k0 * q - DELTA * msg - <row, r>, e2 = c1 + k1 * q - <row, r>
+    let mut init0: [Field; MSG_SLOTS] = [0; MSG_SLOTS];
+    for i in 0..MSG_SLOTS {{ init0[i] = c0_sparse[i] + k0[i] * RLWE_Q - DELTA * msg[i]; }}
+    let mut init1: [Field; N] = [0; N];
+    for i in 0..N {{ init1[i] = c1[i] + k1[i] * RLWE_Q; }}
+    let (calculated_e1, calculated_e2) = negacyclic_mul_sub_pair(init0, {pk_b_src}, init1, {pk_a_src}, r);
 
-    for i in 0..N {{
-        let ip = inner_product(PK_A_ROWS[i], r);
-        assert(c1[i] + k1[i] * RLWE_Q == ip + e2[i]);
-    }}
+    range_proof_signed_batch(calculated_e1);{e1_tie}
+    range_proof_signed_batch(calculated_e2);{e2_tie}
 
     let calculated_ct = compute_ct_commitment_packed(c0_sparse, c1);
     assert(ct_commitment == calculated_ct);
@@ -395,207 +566,83 @@ fn main(
 """
 
 
-def gen_circuit_var_e_witness():
-    """Variant 2: var PK (passed as witness), e1/e2 as witness"""
-    return f"""// Variant 2: var PK + e as witness
+def gen_circuit_const_e_witness(pk_b, pk_a):
+    """Variant 1: const PK, e1/e2 as witness (baseline; e tied to the derived values)"""
+    return f"""// Variant 1: const PK + e as witness
 {circuit_common_header()}
 
+{const_pk_globals(tuple(pk_b), tuple(pk_a))}
 {circuit_helper_fns()}
 
-fn main(
-    wa_commitment: pub Field,
-    ct_commitment: pub Field,
-    c0_sparse: pub [Field; MSG_SLOTS],
-    c1: pub [Field; N],
-    secret_key: Field,
-    r: [Field; N],
-    e1_sparse: [Field; MSG_SLOTS],
-    e2: [Field; N],
-    k0: [Field; MSG_SLOTS],
-    k1: [Field; N],
-    pk_b_rows: [[Field; N]; MSG_SLOTS],
-    pk_a_rows: [[Field; N]; N],
-) {{
-    let two_pow_128: Field = 0x100000000000000000000000000000000;
-    let secret_low = secret_key as u128;
-    let secret_high = ((secret_key - secret_low as Field) / two_pow_128) as u128;
-    let scalar = EmbeddedCurveScalar::new(secret_low as Field, secret_high as Field);
-    let pk = fixed_base_scalar_mul(scalar);
-
-    let calculated_wa = poseidon1_hash_2([pk.x, pk.y]);
-    assert(wa_commitment == calculated_wa);
+{circuit_main("PK_B", "PK_A", e_witness=True, var_pk=False)}"""
 
-    let mut msg: [Field; MSG_SLOTS] = [0; MSG_SLOTS];
-    let slots_x = encode_field_to_byte_slots(pk.x);
-    for i in 0..32 {{ msg[i] = slots_x[i]; }}
-    let slots_y = encode_field_to_byte_slots(pk.y);
-    for i in 0..32 {{ msg[32 + i] = slots_y[i]; }}
 
-    for i in 0..N {{ range_proof_signed(r[i]); }}
-    for i in 0..MSG_SLOTS {{ range_proof_signed(e1_sparse[i]); }}
-    for i in 0..N {{ range_proof_signed(e2[i]); }}
-
-    for i in 0..MSG_SLOTS {{
-        let ip = inner_product(pk_b_rows[i], r);
-        assert(c0_sparse[i] + k0[i] * RLWE_Q == ip + e1_sparse[i] + DELTA * msg[i]);
-    }}
+def gen_circuit_var_e_witness():
+    """Variant 2: var PK (pk_b/pk_a polynomials passed as witness), e1/e2 as witness (baseline)"""
+    return f"""// Variant 2: var PK + e as witness
+{circuit_common_header()}
 
-    for i in 0..N {{
-        let ip = inner_product(pk_a_rows[i], r);
-        assert(c1[i] + k1[i] * RLWE_Q == ip + e2[i]);
-    }}
+{circuit_helper_fns()}
 
-    let calculated_ct = compute_ct_commitment_packed(c0_sparse, c1);
-    assert(ct_commitment == calculated_ct);
-}}
-"""
+{circuit_main("pk_b", "pk_a", e_witness=True, var_pk=True)}"""
 
 
-def gen_circuit_const_e_computed(pk_b_rows, pk_a_rows):
+def gen_circuit_const_e_computed(pk_b, pk_a):
     """Variant 3: const PK, e computed inside circuit (no e witness)"""
-    pk_b_block = ',\n'.join(
-        f"    [{', '.join(format_field_noir(v) for v in row)}]" for row in pk_b_rows)
-    pk_a_block = ',\n'.join(
-        f"    [{', '.join(format_field_noir(v) for v in row)}]" for row in pk_a_rows)
-
     return f"""// Variant 3: const PK + e computed (no e witness)
 {circuit_common_header()}
 
-global PK_B_ROWS: [[Field; N]; MSG_SLOTS] = [
-{pk_b_block}
-];
-
-global PK_A_ROWS: [[Field; N]; N] = [
-{pk_a_block}
-];
-
+{const_pk_globals(tuple(pk_b), tuple(pk_a))}
 {circuit_helper_fns()}
 
-fn main(
-    wa_commitment: pub Field,
-    ct_commitment: pub Field,
-    c0_sparse: pub [Field; MSG_SLOTS],
-    c1: pub [Field; N],
-    secret_key: Field,
-    r: [Field; N],
-    k0: [Field; MSG_SLOTS],
-    k1: [Field; N],
-) {{
-    let two_pow_128: Field = 0x100000000000000000000000000000000;
-    let secret_low = secret_key as u128;
-    let secret_high = ((secret_key - secret_low as Field) / two_pow_128) as u128;
-    let scalar = EmbeddedCurveScalar::new(secret_low as Field, secret_high as Field);
-    let pk = fixed_base_scalar_mul(scalar);
-
-    let calculated_wa = poseidon1_hash_2([pk.x, pk.y]);
-    assert(wa_commitment == calculated_wa);
-
-    let mut msg: [Field; MSG_SLOTS] = [0; MSG_SLOTS];
-    let slots_x = encode_field_to_byte_slots(pk.x);
-    for i in 0..32 {{ msg[i] = slots_x[i]; }}
-    let slots_y = encode_field_to_byte_slots(pk.y);
-    for i in 0..32 {{ msg[32 + i] = slots_y[i]; }}
-
-    for i in 0..N {{ range_proof_signed(r[i]); }}
-
-    // e1 computed from public values + quotient witness, then range-checked
-    for i in 0..MSG_SLOTS {{
-        let ip = inner_product(PK_B_ROWS[i], r);
-        let e1_i = c0_sparse[i] + k0[i] * RLWE_Q - ip - DELTA * msg[i];
-        range_proof_signed(e1_i);
-    }}
-
-    // e2 computed from public values + quotient witness, then range-checked
-    for i in 0..N {{
-        let ip = inner_product(PK_A_ROWS[i], r);
-        let e2_i = c1[i] + k1[i] * RLWE_Q - ip;
-        range_proof_signed(e2_i);
-    }}
-
-    let calculated_ct = compute_ct_commitment_packed(c0_sparse, c1);
-    assert(ct_commitment == calculated_ct);
-}}
-"""
+{circuit_main("PK_B", "PK_A", e_witness=False, var_pk=False)}"""
 
 
 def gen_circuit_var_e_computed():
-    """Variant 4: var PK, e computed inside circuit (no e witness)"""
+    """Variant 4: var PK (pk_b/pk_a polynomials), e computed inside circuit (no e witness)"""
     return f"""// Variant 4: var PK + e computed (no e witness)
 {circuit_common_header()}
 
 {circuit_helper_fns()}
 
-fn main(
-    wa_commitment: pub Field,
-    ct_commitment: pub Field,
-    c0_sparse: pub [Field; MSG_SLOTS],
-    c1: pub [Field; N],
-    secret_key: Field,
-    r: [Field; N],
-    k0: [Field; MSG_SLOTS],
-    k1: [Field; N],
-    pk_b_rows: [[Field; N]; MSG_SLOTS],
-    pk_a_rows: [[Field; N]; N],
-) {{
-    let two_pow_128: Field = 0x100000000000000000000000000000000;
-    let secret_low = secret_key as u128;
-    let secret_high = ((secret_key - secret_low as Field) / two_pow_128) as u128;
-    let scalar = EmbeddedCurveScalar::new(secret_low as Field, secret_high as Field);
-    let pk = fixed_base_scalar_mul(scalar);
+{circuit_main("pk_b", "pk_a", e_witness=False, var_pk=True)}"""
 
-    let calculated_wa = poseidon1_hash_2([pk.x, pk.y]);
-    assert(wa_commitment == calculated_wa);
 
-    let mut msg: [Field; MSG_SLOTS] = [0; MSG_SLOTS];
-    let slots_x = encode_field_to_byte_slots(pk.x);
-    for i in 0..32 {{ msg[i] = slots_x[i]; }}
-    let slots_y = encode_field_to_byte_slots(pk.y);
-    for i in 0..32 {{ msg[32 + i] = slots_y[i]; }}
+def gen_circuit_const_e_witness_base_table(pk_b, pk_a):
+    """Variant 5: variant 1 with derive_pk through BASE_TABLE instead of fixed_base_scalar_mul"""
+    return f"""// Variant 5: const PK + e as witness, fixed-base table key derivation
+{circuit_common_header(base_table=True)}
 
-    for i in 0..N {{ range_proof_signed(r[i]); }}
+{const_pk_globals(tuple(pk_b), tuple(pk_a))}
+{circuit_helper_fns(base_table=True)}
 
-    for i in 0..MSG_SLOTS {{
-        let ip = inner_product(pk_b_rows[i], r);
-        let e1_i = c0_sparse[i] + k0[i] * RLWE_Q - ip - DELTA * msg[i];
-        range_proof_signed(e1_i);
-    }}
+{circuit_main("PK_B", "PK_A", e_witness=True, var_pk=False)}"""
 
-    for i in 0..N {{
-        let ip = inner_product(pk_a_rows[i], r);
-        let e2_i = c1[i] + k1[i] * RLWE_Q - ip;
-        range_proof_signed(e2_i);
-    }}
 
-    let calculated_ct = compute_ct_commitment_packed(c0_sparse, c1);
-    assert(ct_commitment == calculated_ct);
-}}
-"""
+def _write_toml_array(f, name, values):
+    # Header, body and footer go straight to the file buffer; the joined body is never re-copied into an f-string
+    f.write(f"{name} = [")
+    f.write(format_field_array(values))
+    f.write("]\n")
 
 
-def write_prover_toml(path, data, include_e, include_pk_rows, pk_b_rows=None, pk_a_rows=None):
+def write_prover_toml(path, data, include_e, include_pk, pk_b=None, pk_a=None):
     """Write Prover.toml for a variant."""
     with open(path, "w") as f:
         f.write(f"secret_key = {format_field(data['secret_key'])}\n")
         f.write(f"wa_commitment = {format_field(data['wa_commitment'])}\n")
         f.write(f"ct_commitment = {format_field(data['ct_commitment'])}\n")
-        f.write(f"c0_sparse = [{', '.join(format_field(v) for v in data['c0_sparse'])}]\n")
-        f.write(f"c1 = [{', '.join(format_field(v) for v in data['c1'])}]\n")
-        f.write(f"r = [{', '.join(format_field(v) for v in data['r_signed'])}]\n")
+        _write_toml_array(f, "c0_sparse", data['c0_sparse'])
+        _write_toml_array(f, "c1", data['c1'])
+        _write_toml_array(f, "r", data['r_signed'])
         if include_e:
-            f.write(f"e1_sparse = [{', '.join(format_field(v) for v in data['e1_signed'])}]\n")
-            f.write(f"e2 = [{', '.join(format_field(v) for v in data['e2_signed'])}]\n")
-        f.write(f"k0 = [{', '.join(format_field(v) for v in data['k0'])}]\n")
-        f.write(f"k1 = [{', '.join(format_field(v) for v in data['k1'])}]\n")
-        if include_pk_rows:
-            # Write pk_b_rows as 2D array
-            f.write("pk_b_rows = [\n")
-            for row in pk_b_rows:
-                f.write(f"  [{', '.join(format_field(v) for v in row)}],\n")
-            f.write("]\n")
-            f.write("pk_a_rows = [\n")
-            for row in pk_a_rows:
-                f.write(f"  [{', '.join(format_field(v) for v in row)}],\n")
-            f.write("]\n")
+            _write_toml_array(f, "e1_sparse", data['e1_signed'])
+            _write_toml_array(f, "e2", data['e2_signed'])
+        _write_toml_array(f, "k0", data['k0'])
+        _write_toml_array(f, "k1", data['k1'])
+        if include_pk:
+            _write_toml_array(f, "pk_b", pk_b)
+            _write_toml_array(f, "pk_a", pk_a)
 
 
 def run_benchmark(variant_name, circuit_dir, try_prove=True):
@@ -603,19 +650,19 @@ def run_benchmark(variant_name, circuit_dir, try_prove=True):
     metrics = {"name": variant_name}
 
     # nargo compile
-    print(f"  nargo compile...")
+    print(f"  [{variant_name}] nargo compile...")
     t0 = time.time()
     result = subprocess.run([NARGO, "compile"], cwd=circuit_dir, check=True,
                            capture_output=True, text=True)
     metrics["compile_time"] = time.time() - t0
-    print(f"  nargo compile: {metrics['compile_time']:.1f}s")
+    print(f"  [{variant_name}] nargo compile: {metrics['compile_time']:.1f}s")
 
     # nargo execute
-    print(f"  nargo execute...")
+    print(f"  [{variant_name}] nargo execute...")
     t0 = time.time()
     subprocess.run([NARGO, "execute"], cwd=circuit_dir, check=True, capture_output=True)
     metrics["execute_time"] = time.time() - t0
-    print(f"  nargo execute: {metrics['execute_time']:.1f}s")
+    print(f"  [{variant_name}] nargo execute: {metrics['execute_time']:.1f}s")
 
     # Get circuit size from ACIR
     target_dir = os.path.join(circuit_dir, "target")
@@ -639,11 +686,8 @@ def run_benchmark(variant_name, circuit_dir, try_prove=True):
 
     if not try_prove:
         # Just do sunspot compile for constraint count
-        print(f"  sunspot compile (constraints only)...")
-        result = subprocess.run([SUNSPOT, "compile", acir_file], check=True,
-                               capture_output=True, text=True)
-        output = result.stdout + result.stderr
-        match = re.search(r'nbConstraints=(\d+)', output)
+        print(f"  [{variant_name}] sunspot compile (constraints only)...")
+        match, _ = run_search([SUNSPOT, "compile", acir_file], NB_CONSTRAINTS_RE)
         if match:
             metrics["constraints"] = int(match.group(1))
         ccs_file = acir_file.replace(".json", ".ccs")
@@ -655,54 +699,98 @@ def run_benchmark(variant_name, circuit_dir, try_prove=True):
         return metrics
 
     # sunspot compile
-    print(f"  sunspot compile...")
+    print(f"  [{variant_name}] sunspot compile...")
     t0 = time.time()
-    result = subprocess.run([SUNSPOT, "compile", acir_file], check=True,
-                           capture_output=True, text=True)
-    output = result.stdout + result.stderr
+    match, _ = run_search([SUNSPOT, "compile", acir_file], NB_CONSTRAINTS_RE)
     metrics["sunspot_compile_time"] = time.time() - t0
-    match = re.search(r'nbConstraints=(\d+)', output)
     if match:
         metrics["constraints"] = int(match.group(1))
     ccs_file = acir_file.replace(".json", ".ccs")
     metrics["ccs_size"] = os.path.getsize(ccs_file) / 1024 / 1024
 
-    # sunspot setup
-    print(f"  sunspot setup...")
-    t0 = time.time()
-    subprocess.run([SUNSPOT, "setup", ccs_file], check=True, capture_output=True)
-    metrics["setup_time"] = time.time() - t0
-    pk_file = ccs_file.replace(".ccs", ".pk")
-    vk_file = ccs_file.replace(".ccs", ".vk")
-    metrics["pk_size"] = os.path.getsize(pk_file) / 1024 / 1024
-
-    # sunspot prove
-    print(f"  sunspot prove...")
-    t0 = time.time()
-    try:
-        subprocess.run([SUNSPOT, "prove", acir_file, witness_file, ccs_file, pk_file],
-                      check=True, capture_output=True, text=True)
-        metrics["prove_time"] = time.time() - t0
-        proof_file = ccs_file.replace(".ccs", ".proof")
-        pw_file = ccs_file.replace(".ccs", ".pw")
-        metrics["proof_size"] = os.path.getsize(proof_file)
-
-        # sunspot verify
-        print(f"  sunspot verify...")
+    with _SUNSPOT_PROVER_SLOTS:
+        # sunspot setup
+        print(f"  [{variant_name}] sunspot setup...")
         t0 = time.time()
-        subprocess.run([SUNSPOT, "verify", vk_file, proof_file, pw_file],
-                      check=True, capture_output=True)
-        metrics["verify_time"] = time.time() - t0
-    except subprocess.CalledProcessError as e:
-        print(f"  sunspot prove FAILED: {e}")
-        metrics["prove_time"] = None
-        metrics["proof_size"] = None
-        metrics["verify_time"] = None
+        subprocess.run([SUNSPOT, "setup", ccs_file], check=True, capture_output=True)
+        metrics["setup_time"] = time.time() - t0
+        pk_file = ccs_file.replace(".ccs", ".pk")
+        vk_file = ccs_file.replace(".ccs", ".vk")
+        metrics["pk_size"] = os.path.getsize(pk_file) / 1024 / 1024
+
+        # sunspot prove
+        print(f"  [{variant_name}] sunspot prove...")
+        t0 = time.time()
+        try:
+            subprocess.run([SUNSPOT, "prove", acir_file, witness_file, ccs_file, pk_file],
+                          check=True, capture_output=True, text=True)
+            metrics["prove_time"] = time.time() - t0
+            proof_file = ccs_file.replace(".ccs", ".proof")
+            pw_file = ccs_file.replace(".ccs", ".pw")
+            metrics["proof_size"] = os.path.getsize(proof_file)
+
+            # sunspot verify
+            print(f"  [{variant_name}] sunspot verify...")
+            t0 = time.time()
+            subprocess.run([SUNSPOT, "verify", vk_file, proof_file, pw_file],
+                          check=True, capture_output=True)
+            metrics["verify_time"] = time.time() - t0
+        except subprocess.CalledProcessError as e:
+            print(f"  [{variant_name}] sunspot prove FAILED: {e}")
+            metrics["prove_time"] = None
+            metrics["proof_size"] = None
+            metrics["verify_time"] = None
 
     return metrics
 
 
-def main():
+# (variant name, circuit generator, include_e, var_pk)
+# const-PK generators take the pk_b/pk_a polynomials to embed; var-PK generators
+# take none and receive them through Prover.toml instead.
+VARIANTS = [
+    ("const_pk_e_witness", gen_circuit_const_e_witness, True, False),
+    ("var_pk_e_witness", gen_circuit_var_e_witness, True, True),
+    # e computed variants: prove may fail due to sunspot witness mismatch
+    ("const_pk_e_computed", gen_circuit_const_e_computed, False, False),
+    ("var_pk_e_computed", gen_circuit_var_e_computed, False, True),
+    # Same circuit as const_pk_e_witness apart from derive_pk, so the two rows'
+    # constraint counts isolate the cost of the fixed-base table
+    ("const_pk_e_witness_base_table", gen_circuit_const_e_witness_base_table, True, False),
+]
+
+
+def run_variant(variant_id, shared):
+    """Generate, write and benchmark VARIANTS[variant_id]; returns its metrics."""
+    variant, gen_fn, include_e, var_pk = VARIANTS[variant_id]
+    print(f"\n{'='*60}")
+    print(f"Variant {variant_id + 1}: {variant}")
+    print(f"{'='*60}")
+    circuit_dir = os.path.join(PROJ_DIR, f"bench_{variant}")
+    os.makedirs(os.path.join(circuit_dir, "src"), exist_ok=True)
+    shutil.rmtree(os.path.join(circuit_dir, "target"), ignore_errors=True)
+
+    write_if_changed(os.path.join(circuit_dir, "Nargo.toml"), f"""[package]
+name = "{variant}"
+type = "bin"
+authors = [""]
+compiler_version = ">=0.39.0"
+
+[dependencies]
+poseidon = {{ tag = "v0.1.1", git = "https://github.com/noir-lang/poseidon" }}
+""")
+
+    if var_pk:
+        circuit_code = gen_fn()
+    else:
+        circuit_code = gen_fn(shared["pk_b"], shared["pk_a"])
+    write_if_changed(os.path.join(circuit_dir, "src", "main.nr"), circuit_code)
+    write_prover_toml(os.path.join(circuit_dir, "Prover.toml"), shared["witness_data"],
+                      include_e=include_e, include_pk=var_pk,
+                      pk_b=shared["pk_b"], pk_a=shared["pk_a"])
+    return run_benchmark(variant, circuit_dir, try_prove=True)
+
+
+def main(parallel=False):
     rng = random.Random(999)
     secret_key = 12345
 
@@ -730,31 +818,21 @@ def main():
     e1_mod_q = [v % RLWE_Q for v in e1_signed]
     e2_mod_q = [v % RLWE_Q for v in e2_signed]
 
-    br = negacyclic_mul_mod_q(rlwe_pk_b, r_mod_q, N, RLWE_Q)
+    br, ar = negacyclic_mul_ntt_many([rlwe_pk_b, rlwe_pk_a], r_mod_q, N, RLWE_Q)
     c0_sparse = [(br[i] + e1_mod_q[i] + DELTA * msg[i]) % RLWE_Q for i in range(MSG_SLOTS)]
-
-    ar = negacyclic_mul_mod_q(rlwe_pk_a, r_mod_q, N, RLWE_Q)
     c1 = [(ar[i] + e2_mod_q[i]) % RLWE_Q for i in range(N)]
 
-    # Quotients
-    pk_b_rows = [negacyclic_matrix_row_mod_q(rlwe_pk_b, k, N, RLWE_Q) for k in range(MSG_SLOTS)]
-    pk_a_rows = [negacyclic_matrix_row_mod_q(rlwe_pk_a, k, N, RLWE_Q) for k in range(N)]
-
-    k0_list = []
-    for i in range(MSG_SLOTS):
-        ip_int = sum(pk_b_rows[i][j] * r_signed[j] for j in range(N))
-        full_val = ip_int + e1_signed[i] + DELTA * msg[i]
-        k, rem = divmod_with_remainder(full_val, RLWE_Q)
-        assert rem == c0_sparse[i]
-        k0_list.append(k)
-
-    k1_list = []
-    for i in range(N):
-        ip_int = sum(pk_a_rows[i][j] * r_signed[j] for j in range(N))
-        full_val = ip_int + e2_signed[i]
-        k, rem = divmod_with_remainder(full_val, RLWE_Q)
-        assert rem == c1[i]
-        k1_list.append(k)
+    # Quotients: |<row, r>| < N * q * 3 < 2^41, so the whole computation is exact in int64
+    ip_b = negacyclic_mul_signed(rlwe_pk_b, r_signed, N)[:MSG_SLOTS]
+    ip_a = negacyclic_mul_signed(rlwe_pk_a, r_signed, N)
+
+    k0_arr, rem0 = np.divmod(ip_b + np.asarray(e1_signed) + DELTA * np.asarray(msg), RLWE_Q)
+    assert (rem0 == np.asarray(c0_sparse)).all()
+    k0_list = k0_arr.tolist()
+
+    k1_arr, rem1 = np.divmod(ip_a + np.asarray(e2_signed), RLWE_Q)
+    assert (rem1 == np.asarray(c1)).all()
+    k1_list = k1_arr.tolist()
 
     # ct_commitment
     print("=== ct_commitment ===")
@@ -773,130 +851,23 @@ def main():
         "k1": k1_list,
     }
 
-    all_results = []
-
-    # ============================================================
-    # Variant 1: const PK + e witness
-    # ============================================================
-    variant = "const_pk_e_witness"
-    print(f"\n{'='*60}")
-    print(f"Variant 1: {variant}")
-    print(f"{'='*60}")
-    circuit_dir = os.path.join(PROJ_DIR, f"bench_{variant}")
-    os.makedirs(os.path.join(circuit_dir, "src"), exist_ok=True)
-    shutil.rmtree(os.path.join(circuit_dir, "target"), ignore_errors=True)
-
-    with open(os.path.join(circuit_dir, "Nargo.toml"), "w") as f:
-        f.write(f"""[package]
-name = "{variant}"
-type = "bin"
-authors = [""]
-compiler_version = ">=0.39.0"
-
-[dependencies]
-poseidon = {{ tag = "v0.1.1", git = "https://github.com/noir-lang/poseidon" }}
-""")
-
-    circuit_code = gen_circuit_const_e_witness(pk_b_rows, pk_a_rows)
-    with open(os.path.join(circuit_dir, "src", "main.nr"), "w") as f:
-        f.write(circuit_code)
-    write_prover_toml(os.path.join(circuit_dir, "Prover.toml"), witness_data,
-                      include_e=True, include_pk_rows=False)
-    metrics = run_benchmark(variant, circuit_dir, try_prove=True)
-    all_results.append(metrics)
-
-    # ============================================================
-    # Variant 2: var PK + e witness
-    # ============================================================
-    variant = "var_pk_e_witness"
-    print(f"\n{'='*60}")
-    print(f"Variant 2: {variant}")
-    print(f"{'='*60}")
-    circuit_dir = os.path.join(PROJ_DIR, f"bench_{variant}")
-    os.makedirs(os.path.join(circuit_dir, "src"), exist_ok=True)
-    shutil.rmtree(os.path.join(circuit_dir, "target"), ignore_errors=True)
-
-    with open(os.path.join(circuit_dir, "Nargo.toml"), "w") as f:
-        f.write(f"""[package]
-name = "{variant}"
-type = "bin"
-authors = [""]
-compiler_version = ">=0.39.0"
-
-[dependencies]
-poseidon = {{ tag = "v0.1.1", git = "https://github.com/noir-lang/poseidon" }}
-""")
-
-    circuit_code = gen_circuit_var_e_witness()
-    with open(os.path.join(circuit_dir, "src", "main.nr"), "w") as f:
-        f.write(circuit_code)
-    write_prover_toml(os.path.join(circuit_dir, "Prover.toml"), witness_data,
-                      include_e=True, include_pk_rows=True,
-                      pk_b_rows=pk_b_rows, pk_a_rows=pk_a_rows)
-    metrics = run_benchmark(variant, circuit_dir, try_prove=True)
-    all_results.append(metrics)
-
-    # ============================================================
-    # Variant 3: const PK + e computed
-    # ============================================================
-    variant = "const_pk_e_computed"
-    print(f"\n{'='*60}")
-    print(f"Variant 3: {variant}")
-    print(f"{'='*60}")
-    circuit_dir = os.path.join(PROJ_DIR, f"bench_{variant}")
-    os.makedirs(os.path.join(circuit_dir, "src"), exist_ok=True)
-    shutil.rmtree(os.path.join(circuit_dir, "target"), ignore_errors=True)
-
-    with open(os.path.join(circuit_dir, "Nargo.toml"), "w") as f:
-        f.write(f"""[package]
-name = "{variant}"
-type = "bin"
-authors = [""]
-compiler_version = ">=0.39.0"
-
-[dependencies]
-poseidon = {{ tag = "v0.1.1", git = "https://github.com/noir-lang/poseidon" }}
-""")
-
-    circuit_code = gen_circuit_const_e_computed(pk_b_rows, pk_a_rows)
-    with open(os.path.join(circuit_dir, "src", "main.nr"), "w") as f:
-        f.write(circuit_code)
-    write_prover_toml(os.path.join(circuit_dir, "Prover.toml"), witness_data,
-                      include_e=False, include_pk_rows=False)
-    # Try prove — may fail due to sunspot witness mismatch
-    metrics = run_benchmark(variant, circuit_dir, try_prove=True)
-    all_results.append(metrics)
-
-    # ============================================================
-    # Variant 4: var PK + e computed
-    # ============================================================
-    variant = "var_pk_e_computed"
-    print(f"\n{'='*60}")
-    print(f"Variant 4: {variant}")
-    print(f"{'='*60}")
-    circuit_dir = os.path.join(PROJ_DIR, f"bench_{variant}")
-    os.makedirs(os.path.join(circuit_dir, "src"), exist_ok=True)
-    shutil.rmtree(os.path.join(circuit_dir, "target"), ignore_errors=True)
-
-    with open(os.path.join(circuit_dir, "Nargo.toml"), "w") as f:
-        f.write(f"""[package]
-name = "{variant}"
-type = "bin"
-authors = [""]
-compiler_version = ">=0.39.0"
-
-[dependencies]
-poseidon = {{ tag = "v0.1.1", git = "https://github.com/noir-lang/poseidon" }}
-""")
+    shared = {
+        "witness_data": witness_data,
+        "pk_b": rlwe_pk_b,
+        "pk_a": rlwe_pk_a,
+    }
 
-    circuit_code = gen_circuit_var_e_computed()
-    with open(os.path.join(circuit_dir, "src", "main.nr"), "w") as f:
-        f.write(circuit_code)
-    write_prover_toml(os.path.join(circuit_dir, "Prover.toml"), witness_data,
-                      include_e=False, include_pk_rows=True,
-                      pk_b_rows=pk_b_rows, pk_a_rows=pk_a_rows)
-    metrics = run_benchmark(variant, circuit_dir, try_prove=True)
-    all_results.append(metrics)
+    # One variant at a time by default, so each one's timings are not skewed by the
+    # others competing for CPU and RAM. With parallel=True the variants (which only
+    # share read-only inputs and each write to their own bench_<variant> dir) run side
+    # by side: faster end to end, but the per-stage timings are no longer comparable.
+    if parallel:
+        global _SUNSPOT_PROVER_SLOTS
+        _SUNSPOT_PROVER_SLOTS = threading.BoundedSemaphore(PARALLEL_MAX_CONCURRENT_PROVERS)
+        with ThreadPoolExecutor(max_workers=len(VARIANTS)) as ex:
+            all_results = list(ex.map(run_variant, range(len(VARIANTS)), [shared] * len(VARIANTS)))
+    else:
+        all_results = [run_variant(i, shared) for i in range(len(VARIANTS))]
 
     # ============================================================
     # Print results
@@ -906,7 +877,7 @@ poseidon = {{ tag = "v0.1.1", git = "https://github.com/noir-lang/poseidon" }}
         RLWE_Q, DELTA, N, MSG_SLOTS))
     print(f"{'='*80}")
 
-    header = f"{'Variant':<28} {'Constraints':>12} {'Compile':>10} {'Execute':>10} {'Prove':>10} {'Verify':>10} {'Proof':>8} {'CCS':>8} {'main.nr':>10} {'Prover':>10}"
+    header = f"{'Variant':<30} {'Constraints':>12} {'Compile':>10} {'Execute':>10} {'Prove':>10} {'Verify':>10} {'Proof':>8} {'CCS':>8} {'main.nr':>10} {'Prover':>10}"
     print(header)
     print("-" * len(header))
 
@@ -920,7 +891,9 @@ poseidon = {{ tag = "v0.1.1", git = "https://github.com/noir-lang/poseidon" }}
         ccs_s = f"{m['ccs_size']:.1f}MB"
         main_s = f"{m['circuit_file_size']:.1f}MB"
         prover_s = f"{m['prover_toml_size']:.0f}KB"
-        print(f"{m['name']:<28} {constraints:>12} {compile_t:>10} {execute_t:>10} {prove_t:>10} {verify_t:>10} {proof_s:>8} {ccs_s:>8} {main_s:>10} {prover_s:>10}")
+        print(f"{m['name']:<30} {constraints:>12} {compile_t:>10} {execute_t:>10} {prove_t:>10} {verify_t:>10} {proof_s:>8} {ccs_s:>8} {main_s:>10} {prover_s:>10}")
+    if parallel:
+        print("\nNOTE: variants ran concurrently (--parallel); timings include contention between them.")
 
     # Save JSON
     results_path = os.path.join(PROJ_DIR, "benchmark_results.json")
@@ -929,11 +902,9 @@ poseidon = {{ tag = "v0.1.1", git = "https://github.com/noir-lang/poseidon" }}
     print(f"\nResults saved to {results_path}")
 
 
-def divmod_with_remainder(full_value, q):
-    r = full_value % q
-    k = (full_value - r) // q
-    return k, r
-
-
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--parallel", action="store_true",
+                        help="run the variants concurrently (faster, but timings are contaminated)")
+    args = parser.parse_args()
+    main(parallel=args.parallel)
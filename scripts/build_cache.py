@@ -0,0 +1,57 @@
+"""Skip rewriting generated files and recompiling Noir packages that are already up to date.
+
+Shared by generate_audit.py and benchmark_all.py.
+"""
+import functools
+import hashlib
+import os
+import subprocess
+
+
+@functools.lru_cache(maxsize=None)
+def nargo_version(nargo):
+    """`nargo --version` output, or "" if nargo cannot be run."""
+    try:
+        return subprocess.run([nargo, "--version"], check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def write_if_changed(path, content):
+    """Write content to path unless the file already holds exactly that text (keeps its mtime).
+
+    The new text goes to a temp file first and is moved into place with os.replace, so
+    readers never see a half-written file. Returns True if the file changed.
+    """
+    data = content.encode()
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def nargo_compile_cached(nargo, package_dir, package_name, source, **run_kwargs):
+    """Run `nargo compile` unless target/<package>.json was built from this exact source and toolchain.
+
+    The sha256 of `nargo --version` and the package's Nargo.toml + main.nr is kept in
+    <package_dir>/.src_hash, so upgrading nargo recompiles. run_kwargs go to subprocess.run.
+    Returns True if nargo actually ran.
+    """
+    src_hash = hashlib.sha256((nargo_version(nargo) + "\0" + source).encode()).hexdigest()
+    hash_path = os.path.join(package_dir, ".src_hash")
+    artifact = os.path.join(package_dir, "target", f"{package_name}.json")
+    if os.path.exists(artifact) and os.path.exists(hash_path):
+        with open(hash_path) as f:
+            if f.read() == src_hash:
+                return False
+    subprocess.run([nargo, "compile"], cwd=package_dir, check=True, **run_kwargs)
+    with open(hash_path, "w") as f:
+        f.write(src_hash)
+    return True
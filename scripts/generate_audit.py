@@ -5,7 +5,8 @@ Uses ciphertext modulus q = 167772161 (same as ZKPayroll).
 Encryption is mod q; circuit proves correctness via quotient witnesses.
 
 Poseidon1 for wa_commitment (matching shielded-pool), Poseidon2 for ct_commitment.
-Constant PK approach with hardcoded negacyclic matrix rows.
+Constant PK approach: b's first MSG_SLOTS negacyclic matrix rows and a's 2N-entry
+sign-extended coefficient table are hardcoded.
 
 Circuit proves:
   c0[i] + k0[i] * Q == <PK_B_ROW[i], r> + e1[i] + DELTA * msg[i]   (over BN254)
@@ -13,13 +14,24 @@ Circuit proves:
 where k0, k1 are quotient witnesses from the mod q reduction.
 """
 import os
+import argparse
 import subprocess
-import random
-import re
 import json
 import math
 import shutil
 import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import poseidon1_bn254
+import poseidon2_bn254
+from build_cache import nargo_compile_cached, nargo_version, write_if_changed
+from grumpkin import grumpkin_mul
+from nargo_output import CIRCUIT_OUT_RE, CIRCUIT_OUT_TRIPLE_RE, nargo_execute_search
+from negacyclic_ntt import negacyclic_mul_ntt_many, ntt_tables
+from noir_snippets import RANGE_PROOF_SIGNED_BATCH
 
 N = 1024
 RLWE_Q = 167772161  # 40 * 2^22 + 1
@@ -41,53 +53,69 @@ ARTIFACTS_DIR = os.path.join(CIRCUIT_DIR, "target")
 NARGO = os.path.expanduser("~/.nargo/bin/nargo")
 SUNSPOT = os.path.expanduser("~/gopath/bin/sunspot")
 
+# Twiddle tables for the module's (N, RLWE_Q), built once at import
+ntt_tables(N, RLWE_Q)
+
 
-def negacyclic_mul_mod_q(a, b, n, q):
-    result = [0] * n
-    for i in range(n):
-        for j in range(n):
-            idx = i + j
-            if idx < n:
-                result[idx] = (result[idx] + a[i] * b[j]) % q
-            else:
-                result[idx - n] = (result[idx - n] - a[i] * b[j]) % q
-    return result
+def negacyclic_matrix_rows_mod_q(poly, num_rows, n, q):
+    """First num_rows rows of the negacyclic matrix for polynomial, coefficients mod q.
+
+    Row k, column j is poly[k - j] for j <= k and -poly[n + k - j] otherwise, i.e.
+    ext[n + k - j] with ext = [-poly mod q | poly mod q]: one fancy-index gather for
+    all rows, returned as a (num_rows, n) int64 array.
+    """
+    ext = negacyclic_ext_mod_q(poly, q)
+    idx = n + np.arange(num_rows)[:, None] - np.arange(n)[None, :]
+    return ext[idx]
 
 
-def negacyclic_matrix_row_mod_q(poly, k, n, q):
-    """Row k of negacyclic matrix for polynomial, coefficients mod q."""
-    row = [0] * n
-    for j in range(n):
-        idx = k - j
-        if idx >= 0:
-            row[j] = poly[idx] % q
-        else:
-            row[j] = (-poly[idx + n]) % q
-    return row
+def negacyclic_ext_mod_q(poly, q):
+    """ext = [-poly mod q | poly mod q]; row k, column j of the negacyclic matrix is ext[n + k - j]."""
+    p = np.asarray(poly, dtype=np.int64) % q
+    return np.concatenate([(q - p) % q, p])
 
 
 def encode_field_to_bytes(value, num_bytes=32):
     """Encode a field element to byte slots (8-bit each)."""
-    slots = []
-    for i in range(num_bytes):
-        slots.append((value >> (i * 8)) & 0xFF)
-    return slots
+    return list((value % (1 << (8 * num_bytes))).to_bytes(num_bytes, "little"))
+
+
+# Field elements below this are written in decimal; larger ones (negative values
+# wrapped mod BN254_P, hashes, curve coordinates) are shorter as unpadded hex
+_SHORT_DECIMAL_BOUND = 10 ** 12
 
 
 def format_field(v):
     """Format for Prover.toml (BN254 field element)."""
     v = v % BN254_P
-    if v == 0:
-        return '"0"'
-    return f'"0x{v:064x}"'
+    if v < _SHORT_DECIMAL_BOUND:
+        return f'"{v}"'
+    return f'"0x{v:x}"'
+
+
+def format_toml_array(values):
+    """Prover.toml array literal: format_field of each value, inlined into one join."""
+    return "[" + ", ".join([f'"{x}"' if (x := v % BN254_P) < _SHORT_DECIMAL_BOUND else f'"0x{x:x}"'
+                            for v in values]) + "]"
 
 
 def format_field_noir(v):
     """Format for Noir source (BN254 field element)."""
     v = v % BN254_P
-    if v == 0:
-        return '0'
-    return f'0x{v:064x}'
+    if v < _SHORT_DECIMAL_BOUND:
+        return str(v)
+    return f'0x{v:x}'
+
+
+def format_rows_noir(rows):
+    """Noir array-of-arrays body for a 2D array of coefficients in [0, q).
+
+    All coefficients are formatted in one pass as plain decimal literals (no BN254
+    reduction or hex padding needed below q), then sliced back into rows.
+    """
+    num_rows, n = rows.shape
+    strs = list(map(str, rows.ravel().tolist()))
+    return ",\n".join(["    [" + ", ".join(strs[k * n:(k + 1) * n]) + "]" for k in range(num_rows)])
 
 
 def load_rlwe_pk():
@@ -99,13 +127,17 @@ def load_rlwe_pk():
     return a, b
 
 
-def run_bjj_helper_poseidon1(secret_key):
-    """Use bjj_helper with Poseidon1 (dep::poseidon) to match shielded-pool."""
-    helper_dir = os.path.join(PROJ_DIR, "bjj_helper_p1")
-    os.makedirs(os.path.join(helper_dir, "src"), exist_ok=True)
+AUDIT_NARGO_TOML = """[package]
+name = "rlwe_audit"
+type = "bin"
+authors = [""]
+compiler_version = ">=0.39.0"
+
+[dependencies]
+poseidon = { tag = "v0.1.1", git = "https://github.com/noir-lang/poseidon" }
+"""
 
-    with open(os.path.join(helper_dir, "Nargo.toml"), "w") as f:
-        f.write("""[package]
+_BJJ_HELPER_NARGO_TOML = """[package]
 name = "bjj_helper_p1"
 type = "bin"
 authors = [""]
@@ -113,10 +145,9 @@ compiler_version = ">=0.39.0"
 
 [dependencies]
 poseidon = { tag = "v0.1.1", git = "https://github.com/noir-lang/poseidon" }
-""")
+"""
 
-    with open(os.path.join(helper_dir, "src", "main.nr"), "w") as f:
-        f.write("""use dep::poseidon::poseidon::bn254::hash_2 as poseidon_hash;
+_BJJ_HELPER_MAIN_NR = """use dep::poseidon::poseidon::bn254::hash_2 as poseidon_hash;
 use std::embedded_curve_ops::{EmbeddedCurveScalar, fixed_base_scalar_mul};
 
 fn main(secret_key: Field) -> pub (Field, Field, Field) {
@@ -129,59 +160,18 @@ fn main(secret_key: Field) -> pub (Field, Field, Field) {
     let wa = poseidon_hash([pk.x, pk.y]);
     (pk.x, pk.y, wa)
 }
-""")
-
-    with open(os.path.join(helper_dir, "Prover.toml"), "w") as f:
-        f.write(f'secret_key = "{secret_key}"\n')
-
-    print("Compiling bjj_helper_p1 (Poseidon1)...")
-    subprocess.run([NARGO, "compile"], cwd=helper_dir, check=True, capture_output=True)
-    print("Executing bjj_helper_p1...")
-    result = subprocess.run([NARGO, "execute"], cwd=helper_dir, check=True, capture_output=True, text=True)
-    output = result.stdout + result.stderr
-
-    match = re.search(r'Circuit output:\s*\((0x[0-9a-fA-F]+),\s*(0x[0-9a-fA-F]+),\s*(0x[0-9a-fA-F]+)\)', output)
-    if not match:
-        print(f"nargo output: {output}")
-        raise RuntimeError("Could not parse bjj_helper_p1 output")
-
-    owner_x = int(match.group(1), 16)
-    owner_y = int(match.group(2), 16)
-    wa_commitment = int(match.group(3), 16)
-    return owner_x, owner_y, wa_commitment
-
-
-def pack_values(values, pack_width=PACK_WIDTH, pack_bits=PACK_BITS):
-    """Pack values into Fields, pack_width values per Field, pack_bits bits each."""
-    packed = []
-    for i in range(0, len(values), pack_width):
-        chunk = values[i:i+pack_width]
-        v = 0
-        for j, c in enumerate(chunk):
-            v += c << (j * pack_bits)
-        packed.append(v)
-    return packed
-
-
-def run_ct_helper_v2(c0_packed, c1_packed):
-    """Compute ct_commitment using Poseidon2 sponge over packed Fields.
-    c0_packed and c1_packed are already packed (7x32-bit).
-    """
-    helper_dir = os.path.join(PROJ_DIR, "ct_helper_v2")
-    os.makedirs(os.path.join(helper_dir, "src"), exist_ok=True)
+"""
 
-    with open(os.path.join(helper_dir, "Nargo.toml"), "w") as f:
-        f.write("""[package]
+_CT_HELPER_NARGO_TOML = """[package]
 name = "ct_helper_v2"
 type = "bin"
 authors = [""]
 compiler_version = ">=0.39.0"
 
 [dependencies]
-""")
+"""
 
-    with open(os.path.join(helper_dir, "src", "main.nr"), "w") as f:
-        f.write(f"""use std::hash::poseidon2_permutation;
+_CT_HELPER_MAIN_NR = f"""use std::hash::poseidon2_permutation;
 
 global PACKED_C0: u32 = {PACKED_C0};
 global PACKED_C1: u32 = {PACKED_C1};
@@ -214,37 +204,115 @@ fn main(c0_packed: [Field; PACKED_C0], c1_packed: [Field; PACKED_C1]) -> pub Fie
     state = poseidon2_permutation(state, 4);
     state[0]
 }}
-""")
+"""
 
-    with open(os.path.join(helper_dir, "Prover.toml"), "w") as f:
-        f.write(f"c0_packed = [{', '.join(format_field(v) for v in c0_packed)}]\n")
-        f.write(f"c1_packed = [{', '.join(format_field(v) for v in c1_packed)}]\n")
+# (package name, Nargo.toml, main.nr) of the helper circuits run before the audit circuit
+HELPER_PACKAGES = [
+    ("bjj_helper_p1", _BJJ_HELPER_NARGO_TOML, _BJJ_HELPER_MAIN_NR),
+    ("ct_helper_v2", _CT_HELPER_NARGO_TOML, _CT_HELPER_MAIN_NR),
+]
 
-    print("Compiling ct_helper_v2...")
-    subprocess.run([NARGO, "compile"], cwd=helper_dir, check=True, capture_output=True)
-    print("Executing ct_helper_v2...")
-    result = subprocess.run([NARGO, "execute"], cwd=helper_dir, check=True, capture_output=True, text=True)
-    output = result.stdout + result.stderr
 
-    match = re.search(r'Circuit output:\s*(0x[0-9a-fA-F]+)', output)
-    if not match:
-        raise RuntimeError(f"Could not parse ct_helper_v2 output: {output}")
+SUNSPOT_SETUP_EXTS = (".ccs", ".pk", ".vk")
+
+
+def restore_sunspot_artifacts(cache_dir, target_dir, name):
+    """Copy <name>.ccs/.pk/.vk from cache_dir into target_dir; False if any is missing."""
+    cached = [os.path.join(cache_dir, name + ext) for ext in SUNSPOT_SETUP_EXTS]
+    if not all(os.path.exists(path) for path in cached):
+        return False
+    for path in cached:
+        shutil.copy2(path, target_dir)
+    return True
+
+
+def store_sunspot_artifacts(cache_dir, target_dir, name):
+    """Save target_dir's <name>.ccs/.pk/.vk under cache_dir for later runs."""
+    os.makedirs(cache_dir, exist_ok=True)
+    for ext in SUNSPOT_SETUP_EXTS:
+        shutil.copy2(os.path.join(target_dir, name + ext), cache_dir)
+
+
+def compile_helper(name, nargo_toml, main_nr):
+    """Write the helper package's sources and `nargo compile` it unless they are unchanged."""
+    helper_dir = os.path.join(PROJ_DIR, name)
+    os.makedirs(os.path.join(helper_dir, "src"), exist_ok=True)
+    write_if_changed(os.path.join(helper_dir, "Nargo.toml"), nargo_toml)
+    write_if_changed(os.path.join(helper_dir, "src", "main.nr"), main_nr)
+    print(f"Compiling {name}...")
+    if not nargo_compile_cached(NARGO, helper_dir, name, nargo_toml + main_nr, capture_output=True):
+        print(f"  {name} unchanged, reusing target/{name}.json")
+
+
+def compile_helpers(names):
+    """Compile the named helper packages side by side; each is an independent nargo process."""
+    packages = [pkg for pkg in HELPER_PACKAGES if pkg[0] in names]
+    with ThreadPoolExecutor(max_workers=len(packages)) as pool:
+        list(pool.map(lambda pkg: compile_helper(*pkg), packages))
+
+
+def derive_owner_pk(secret_key):
+    """(owner_x, owner_y, wa_commitment) in-process, matching bjj_helper_p1.
+
+    secret_key * G as in fixed_base_scalar_mul, then Poseidon1 hash_2 of the point.
+    """
+    owner_x, owner_y = grumpkin_mul(secret_key)
+    return owner_x, owner_y, poseidon1_bn254.hash_2([owner_x, owner_y])
+
+
+def run_bjj_helper_poseidon1(secret_key):
+    """Use bjj_helper with Poseidon1 (dep::poseidon) to match shielded-pool.
+
+    Expects the package to be compiled already (see compile_helpers).
+    """
+    helper_dir = os.path.join(PROJ_DIR, "bjj_helper_p1")
+
+    write_if_changed(os.path.join(helper_dir, "Prover.toml"), f'secret_key = "{secret_key}"\n')
+
+    print("Executing bjj_helper_p1...")
+    match = nargo_execute_search(NARGO, helper_dir, CIRCUIT_OUT_TRIPLE_RE)
+    owner_x = int(match.group(1), 16)
+    owner_y = int(match.group(2), 16)
+    wa_commitment = int(match.group(3), 16)
+    return owner_x, owner_y, wa_commitment
 
-    return int(match.group(1), 16)
 
+def pack_values(values, pack_width=PACK_WIDTH, pack_bits=PACK_BITS):
+    """Pack values into Fields, pack_width values per Field, pack_bits bits each.
+
+    Zero-pads to a multiple of pack_width and takes one dot product per row with the
+    slot shifts; dtype=object keeps the 224-bit sums as Python ints.
+    """
+    shifts = np.array([1 << (j * pack_bits) for j in range(pack_width)], dtype=object)
+    padded = np.zeros(-(-len(values) // pack_width) * pack_width, dtype=object)
+    padded[:len(values)] = values
+    return padded.reshape(-1, pack_width).dot(shifts).tolist()
 
-def compute_quotient_and_remainder(full_value, q):
-    """Compute k, r such that full_value = k * q + r, r in [0, q).
-    full_value is computed over integers (can be negative or very large).
-    Returns (k, r) where r = full_value mod q, k = (full_value - r) / q.
+
+def run_ct_helper_v2(c0_packed, c1_packed):
+    """Compute ct_commitment using Poseidon2 sponge over packed Fields.
+    c0_packed and c1_packed are already packed (7x32-bit).
+    Expects the package to be compiled already (see compile_helpers).
     """
-    r = full_value % q
-    k = (full_value - r) // q
-    return k, r
+    helper_dir = os.path.join(PROJ_DIR, "ct_helper_v2")
 
+    write_if_changed(os.path.join(helper_dir, "Prover.toml"), "".join([
+        f"c0_packed = {format_toml_array(c0_packed)}\n",
+        f"c1_packed = {format_toml_array(c1_packed)}\n",
+    ]))
 
-def generate_const_circuit(pk_b_rows_sparse, pk_a_rows_full):
-    """Generate Noir circuit with mod q via quotient witnesses.
+    print("Executing ct_helper_v2...")
+    match = nargo_execute_search(NARGO, helper_dir, CIRCUIT_OUT_RE)
+    return int(match.group(1), 16)
+
+
+def compute_ct_commitment(c0_packed, c1_packed):
+    """ct_commitment in-process: the same Poseidon2 rate-3 sponge as ct_helper_v2 / the audit circuit."""
+    return poseidon2_bn254.sponge_rate3(list(c0_packed) + list(c1_packed))
+
+
+def generate_const_circuit(pk_b_rows_sparse, pk_a_ext):
+    """Generate Noir circuit with mod q via quotient witnesses, as (main.nr, pk_const.nr).
 
     e1, e2 are NOT witness inputs. They are computed inside the circuit:
       e1[i] = c0[i] + k0[i]*Q - <PK_B_ROW[i], r> - DELTA*msg[i]
@@ -252,24 +320,15 @@ def generate_const_circuit(pk_b_rows_sparse, pk_a_rows_full):
     Then range-checked to prove they are small (existence proof).
     """
     # PK rows: coefficients are mod q (small), embedded directly as Noir constants
-    pk_b_rows_strs = []
-    for k in range(MSG_SLOTS):
-        row_str = ', '.join(format_field_noir(v) for v in pk_b_rows_sparse[k])
-        pk_b_rows_strs.append(f"    [{row_str}]")
-    pk_b_block = ',\n'.join(pk_b_rows_strs)
-
-    pk_a_rows_strs = []
-    for k in range(N):
-        row_str = ', '.join(format_field_noir(v) for v in pk_a_rows_full[k])
-        pk_a_rows_strs.append(f"    [{row_str}]")
-    pk_a_block = ',\n'.join(pk_a_rows_strs)
+    pk_b_block = format_rows_noir(pk_b_rows_sparse)
+    pk_a_block = "    " + ", ".join(map(str, pk_a_ext.tolist()))
 
     pack_shift_hex = f'0x{(1 << PACK_BITS):x}'  # 2^32
 
     circuit = f"""// RLWE Audit Circuit for Shielded-Pool Integration
 // Ciphertext modulus q = {RLWE_Q}, plaintext modulus t = {PLAINTEXT_MOD}, Delta = q/t = {DELTA}
 // Poseidon1 for wa_commitment (matches shielded-pool), Poseidon2 for ct_commitment
-// Constant PK: negacyclic matrix rows hardcoded (coefficients in [0, q))
+// Constant PK: b's negacyclic matrix rows and a's [-a | a] table hardcoded (coefficients in [0, q))
 // BFV convention: c0 = (b*r + e1 + Delta*msg) mod q, c1 = (a*r + e2) mod q
 // Circuit proves mod q via quotient: c0[i] + k0[i]*Q == ip + e1[i] + Delta*msg[i]
 // Public inputs: packed {PACK_WIDTH}x{PACK_BITS}-bit (c0: {PACKED_C0} Fields, c1: {PACKED_C1} Fields)
@@ -278,6 +337,10 @@ use dep::poseidon::poseidon::bn254::hash_2 as poseidon1_hash_2;
 use std::hash::poseidon2_permutation;
 use std::embedded_curve_ops::{{EmbeddedCurveScalar, fixed_base_scalar_mul}};
 
+// PK_B_ROWS / PK_A_EXT live in pk_const.nr so edits to the logic leave that file untouched
+mod pk_const;
+use pk_const::{{PK_A_EXT, PK_B_ROWS}};
+
 global N: u32 = {N};
 global MSG_SLOTS: u32 = {MSG_SLOTS};
 global PACK_WIDTH: u32 = {PACK_WIDTH};
@@ -294,24 +357,20 @@ global DELTA: Field = {DELTA};
 // Packing shift: 2^{PACK_BITS}
 global PACK_SHIFT: Field = {pack_shift_hex};
 
-// PK_B_ROWS: first {MSG_SLOTS} rows of negacyclic matrix from polynomial b
-// (for c0 = (b*r + e1 + Delta*msg) mod q)
-global PK_B_ROWS: [[Field; N]; MSG_SLOTS] = [
-{pk_b_block}
-];
-
-// PK_A_ROWS: all {N} rows of negacyclic matrix from polynomial a
-// (for c1 = (a*r + e2) mod q)
-global PK_A_ROWS: [[Field; N]; N] = [
-{pk_a_block}
-];
-
 fn inner_product_const(constant: [Field; N], variable: [Field; N]) -> Field {{
     let mut sum: Field = 0;
     for i in 0..N {{ sum += constant[i] * variable[i]; }}
     sum
 }}
 
+// <PK_A_ROW[row], variable>, where PK_A_ROW[row][j] = PK_A_EXT[N + row - j]; row and j
+// are loop constants after unrolling, so each coefficient is still a folded constant
+fn inner_product_pk_a(row: u32, variable: [Field; N]) -> Field {{
+    let mut sum: Field = 0;
+    for j in 0..N {{ sum += PK_A_EXT[N + row - j] * variable[j]; }}
+    sum
+}}
+
 fn unpack_sparse(packed: [Field; PACKED_C0]) -> [Field; MSG_SLOTS] {{
     let mut result: [Field; MSG_SLOTS] = [0; MSG_SLOTS];
     for i in 0..PACKED_C0 {{
@@ -395,13 +454,7 @@ fn encode_field_to_byte_slots(value: Field) -> [Field; 32] {{
     slots
 }}
 
-fn range_proof_signed(value: Field, bound: u32) {{
-    // Prove value is in [-bound, bound] by checking value + bound fits in u8
-    // For noise_bound=3: value + 128 as u8 (shifted range check)
-    let shifted = value + 128;
-    let _ = shifted as u8;
-}}
-
+{RANGE_PROOF_SIGNED_BATCH}
 fn main(
     wa_commitment: pub Field,
     ct_commitment: pub Field,
@@ -439,9 +492,9 @@ fn main(
     for i in 0..32 {{ msg[32 + i] = slots_y[i]; }}
 
     // 5. Range proof: r, e1, e2 are small (existence proof for small noise)
-    for i in 0..N {{ range_proof_signed(r[i], 128); }}
-    for i in 0..MSG_SLOTS {{ range_proof_signed(e1_sparse[i], 128); }}
-    for i in 0..N {{ range_proof_signed(e2[i], 128); }}
+    range_proof_signed_batch(r);
+    range_proof_signed_batch(e1_sparse);
+    range_proof_signed_batch(e2);
 
     // 6. c0_sparse[i] = (ip + e1[i] + DELTA*msg[i]) mod q
     //    Proved via quotient: c0[i] + k0[i]*Q == ip + e1[i] + DELTA*msg[i] (over BN254)
@@ -453,7 +506,7 @@ fn main(
     // 7. c1[i] = (ip + e2[i]) mod q
     //    Proved via quotient: c1[i] + k1[i]*Q == ip + e2[i] (over BN254)
     for i in 0..N {{
-        let ip = inner_product_const(PK_A_ROWS[i], r);
+        let ip = inner_product_pk_a(i, r);
         assert(c1[i] + k1[i] * RLWE_Q == ip + e2[i]);
     }}
 
@@ -462,11 +515,32 @@ fn main(
     assert(ct_commitment == calculated_ct);
 }}
 """
-    return circuit
+    pk_const = f"""// Constant PK tables (coefficients in [0, q)), generated from rlwe_pk.json
+use crate::{{MSG_SLOTS, N}};
+
+// PK_B_ROWS: first {MSG_SLOTS} rows of negacyclic matrix from polynomial b
+// (for c0 = (b*r + e1 + Delta*msg) mod q)
+pub global PK_B_ROWS: [[Field; N]; MSG_SLOTS] = [
+{pk_b_block}
+];
+
+// PK_A_EXT: [-a mod q | a] for polynomial a; all {N} negacyclic matrix rows index into it
+// (for c1 = (a*r + e2) mod q)
+pub global PK_A_EXT: [Field; {2 * N}] = [
+{pk_a_block}
+];
+"""
+    return circuit, pk_const
+
 
+def main(check_helpers=False):
+    """Generate, compile, execute and prove the audit circuit.
 
-def main():
-    rng = random.Random(999)
+    The owner pubkey, wa_commitment and ct_commitment are computed in Python. With
+    check_helpers, the bjj_helper_p1 / ct_helper_v2 nargo circuits are also run and
+    their outputs cross-checked against those values.
+    """
+    rng = np.random.default_rng(999)
     secret_key = 12345
 
     # Step 1: Load RLWE pk (coefficients mod q)
@@ -479,7 +553,11 @@ def main():
 
     # Step 2: BJJ pubkey with Poseidon1 wa_commitment
     print("\n=== Step 2: BJJ pubkey (Poseidon1) ===")
-    owner_x, owner_y, wa_commitment = run_bjj_helper_poseidon1(secret_key)
+    owner_x, owner_y, wa_commitment = derive_owner_pk(secret_key)
+    if check_helpers:
+        compile_helpers(["bjj_helper_p1", "ct_helper_v2"])
+        helper_out = run_bjj_helper_poseidon1(secret_key)
+        assert helper_out == (owner_x, owner_y, wa_commitment), f"owner pk mismatch: nargo {helper_out}"
     print(f"owner_x = {hex(owner_x)}")
     print(f"owner_y = {hex(owner_y)}")
     print(f"wa_commitment = {hex(wa_commitment)}")
@@ -487,34 +565,26 @@ def main():
     # Step 3: Encode message as 8-bit byte slots + encrypt mod q
     print("\n=== Step 3: Encode & encrypt (mod q) ===")
     msg = [0] * MSG_SLOTS
-    slots_x = encode_field_to_bytes(owner_x, 32)
-    for i in range(32):
-        msg[i] = slots_x[i]
-    slots_y = encode_field_to_bytes(owner_y, 32)
-    for i in range(32):
-        msg[32 + i] = slots_y[i]
+    msg[:32] = encode_field_to_bytes(owner_x, 32)
+    msg[32:64] = encode_field_to_bytes(owner_y, 32)
     print(f"msg slots (first 8): {msg[:8]}")
     assert all(0 <= v <= 255 for v in msg), "msg slots must be 8-bit"
 
-    def small_noise():
-        v = rng.randint(-3, 3)
-        return v
-
-    r_signed = [small_noise() for _ in range(N)]
-    e1_signed = [small_noise() for _ in range(MSG_SLOTS)]
-    e2_signed = [small_noise() for _ in range(N)]
+    # Small noise in [-3, 3] for r, e1, e2, in one draw
+    noise = rng.integers(-3, 4, size=N + MSG_SLOTS + N).tolist()
+    r_signed = noise[:N]
+    e1_signed = noise[N:N + MSG_SLOTS]
+    e2_signed = noise[N + MSG_SLOTS:]
 
     r_mod_q = [v % RLWE_Q for v in r_signed]
     e1_mod_q = [v % RLWE_Q for v in e1_signed]
     e2_mod_q = [v % RLWE_Q for v in e2_signed]
 
     # Encrypt mod q
-    print("Computing b*r (negacyclic mul mod q)...")
-    br = negacyclic_mul_mod_q(rlwe_pk_b, r_mod_q, N, RLWE_Q)
+    # b*r and a*r share r, so its forward transform is done once for both
+    print("Computing b*r, a*r (negacyclic NTT mul mod q)...")
+    br, ar = negacyclic_mul_ntt_many([rlwe_pk_b, rlwe_pk_a], r_mod_q, N, RLWE_Q)
     c0_sparse = [(br[i] + e1_mod_q[i] + DELTA * msg[i]) % RLWE_Q for i in range(MSG_SLOTS)]
-
-    print("Computing a*r (negacyclic mul mod q)...")
-    ar = negacyclic_mul_mod_q(rlwe_pk_a, r_mod_q, N, RLWE_Q)
     c1 = [(ar[i] + e2_mod_q[i]) % RLWE_Q for i in range(N)]
 
     print(f"c0_sparse[0] = {c0_sparse[0]} (should be < q={RLWE_Q})")
@@ -531,47 +601,44 @@ def main():
     # ip_b[i] = sum(PK_B_ROW[i][j] * r[j]) over integers (can be large)
     # We need signed r for correct quotient computation
     # r_signed values are in [-3, 3], PK values in [0, q)
-    # ip can be up to N * q * 3 ~ 1024 * 167M * 3 ~ 5.15e11, fits in Python int
+    # ip can be up to N * q * 3 ~ 1024 * 167M * 3 ~ 5.15e11, so one int64 matmul per
+    # matrix is exact; np.divmod floors like Python, giving the same (k, remainder)
 
-    pk_b_rows_sparse = [negacyclic_matrix_row_mod_q(rlwe_pk_b, k, N, RLWE_Q) for k in range(MSG_SLOTS)]
-    pk_a_rows_full = [negacyclic_matrix_row_mod_q(rlwe_pk_a, k, N, RLWE_Q) for k in range(N)]
+    pk_b_rows_sparse = negacyclic_matrix_rows_mod_q(rlwe_pk_b, MSG_SLOTS, N, RLWE_Q)
+    pk_a_rows_full = negacyclic_matrix_rows_mod_q(rlwe_pk_a, N, N, RLWE_Q)
+    r_arr = np.array(r_signed, dtype=np.int64)
+    ip_b = pk_b_rows_sparse @ r_arr
+    ip_a = pk_a_rows_full @ r_arr
 
-    k0_list = []
-    for i in range(MSG_SLOTS):
-        # Inner product over integers using signed r
-        ip_int = sum(pk_b_rows_sparse[i][j] * r_signed[j] for j in range(N))
-        full_val = ip_int + e1_signed[i] + DELTA * msg[i]
-        k, remainder = compute_quotient_and_remainder(full_val, RLWE_Q)
-        assert remainder == c0_sparse[i], f"c0 mismatch at {i}: {remainder} != {c0_sparse[i]}"
-        k0_list.append(k)
-
-    k1_list = []
-    for i in range(N):
-        ip_int = sum(pk_a_rows_full[i][j] * r_signed[j] for j in range(N))
-        full_val = ip_int + e2_signed[i]
-        k, remainder = compute_quotient_and_remainder(full_val, RLWE_Q)
-        assert remainder == c1[i], f"c1 mismatch at {i}: {remainder} != {c1[i]}"
-        k1_list.append(k)
+    k0_arr, rem0 = np.divmod(ip_b + np.array(e1_signed) + DELTA * np.array(msg), RLWE_Q)
+    assert np.array_equal(rem0, c0_sparse), "c0 mismatch against the integer inner products"
+    k0_list = k0_arr.tolist()
+
+    k1_arr, rem1 = np.divmod(ip_a + np.array(e2_signed), RLWE_Q)
+    assert np.array_equal(rem1, c1), "c1 mismatch against the integer inner products"
+    k1_list = k1_arr.tolist()
 
     print(f"k0 range: [{min(k0_list)}, {max(k0_list)}]")
     print(f"k1 range: [{min(k1_list)}, {max(k1_list)}]")
 
     # Verify the circuit equation over BN254 field
     # c0[i] + k0[i] * Q == ip_bn254 + e1_bn254[i] + DELTA * msg[i]  (mod BN254_P)
-    r_bn254 = [v % BN254_P for v in r_signed]
+    # The inner products over BN254 are just the integer ones reduced mod BN254_P
+    ip_b_list = ip_b.tolist()
+    ip_a_list = ip_a.tolist()
     e1_bn254 = [v % BN254_P for v in e1_signed]
     e2_bn254 = [v % BN254_P for v in e2_signed]
     k0_bn254 = [v % BN254_P for v in k0_list]
     k1_bn254 = [v % BN254_P for v in k1_list]
 
     for i in range(MSG_SLOTS):
-        ip_bn254 = sum(pk_b_rows_sparse[i][j] * r_bn254[j] for j in range(N)) % BN254_P
+        ip_bn254 = ip_b_list[i] % BN254_P
         lhs = (c0_sparse[i] + k0_bn254[i] * RLWE_Q) % BN254_P
         rhs = (ip_bn254 + e1_bn254[i] + DELTA * msg[i]) % BN254_P
         assert lhs == rhs, f"BN254 c0 verification failed at {i}"
 
-    for i in range(min(3, N)):
-        ip_bn254 = sum(pk_a_rows_full[i][j] * r_bn254[j] for j in range(N)) % BN254_P
+    for i in range(N):
+        ip_bn254 = ip_a_list[i] % BN254_P
         lhs = (c1[i] + k1_bn254[i] * RLWE_Q) % BN254_P
         rhs = (ip_bn254 + e2_bn254[i]) % BN254_P
         assert lhs == rhs, f"BN254 c1 verification failed at {i}"
@@ -584,7 +651,10 @@ def main():
     c1_packed = pack_values(c1)
     print(f"c0_packed: {len(c0_packed)} Fields (was {len(c0_sparse)})")
     print(f"c1_packed: {len(c1_packed)} Fields (was {len(c1)})")
-    ct_commitment = run_ct_helper_v2(c0_packed, c1_packed)
+    ct_commitment = compute_ct_commitment(c0_packed, c1_packed)
+    if check_helpers:
+        helper_ct = run_ct_helper_v2(c0_packed, c1_packed)
+        assert helper_ct == ct_commitment, f"ct_commitment mismatch: python {hex(ct_commitment)} != nargo {hex(helper_ct)}"
     print(f"ct_commitment = {hex(ct_commitment)}")
 
     # Save ciphertext for decryption test
@@ -609,71 +679,86 @@ def main():
     print("\n=== Step 5: Generate audit_circuit ===")
     os.makedirs(os.path.join(CIRCUIT_DIR, "src"), exist_ok=True)
 
-    circuit = generate_const_circuit(pk_b_rows_sparse, pk_a_rows_full)
-    with open(os.path.join(CIRCUIT_DIR, "src", "main.nr"), "w") as f:
-        f.write(circuit)
-    print(f"Circuit written ({os.path.getsize(os.path.join(CIRCUIT_DIR, 'src', 'main.nr')) / 1024 / 1024:.1f} MB)")
+    circuit, pk_const = generate_const_circuit(pk_b_rows_sparse, negacyclic_ext_mod_q(rlwe_pk_a, RLWE_Q))
+    write_if_changed(os.path.join(CIRCUIT_DIR, "src", "main.nr"), circuit)
+    write_if_changed(os.path.join(CIRCUIT_DIR, "src", "pk_const.nr"), pk_const)
+    print(f"Circuit written (main.nr {len(circuit) / 1024:.1f} KB, "
+          f"pk_const.nr {os.path.getsize(os.path.join(CIRCUIT_DIR, 'src', 'pk_const.nr')) / 1024 / 1024:.1f} MB)")
 
-    with open(os.path.join(CIRCUIT_DIR, "Nargo.toml"), "w") as f:
-        f.write("""[package]
-name = "rlwe_audit"
-type = "bin"
-authors = [""]
-compiler_version = ">=0.39.0"
-
-[dependencies]
-poseidon = { tag = "v0.1.1", git = "https://github.com/noir-lang/poseidon" }
-""")
+    write_if_changed(os.path.join(CIRCUIT_DIR, "Nargo.toml"), AUDIT_NARGO_TOML)
 
     # Write Prover.toml
     # r, e1, e2, k0, k1 are signed integers → represent in BN254 field
     toml_path = os.path.join(CIRCUIT_DIR, "Prover.toml")
-    with open(toml_path, "w") as f:
-        f.write(f"secret_key = {format_field(secret_key)}\n")
-        f.write(f"wa_commitment = {format_field(wa_commitment)}\n")
-        f.write(f"ct_commitment = {format_field(ct_commitment)}\n")
-        f.write(f"c0_packed = [{', '.join(format_field(v) for v in c0_packed)}]\n")
-        f.write(f"c1_packed = [{', '.join(format_field(v) for v in c1_packed)}]\n")
-        f.write(f"r = [{', '.join(format_field(v) for v in r_signed)}]\n")
-        f.write(f"e1_sparse = [{', '.join(format_field(v) for v in e1_signed)}]\n")
-        f.write(f"e2 = [{', '.join(format_field(v) for v in e2_signed)}]\n")
-        f.write(f"k0 = [{', '.join(format_field(v) for v in k0_list)}]\n")
-        f.write(f"k1 = [{', '.join(format_field(v) for v in k1_list)}]\n")
+    prover_toml = "".join([
+        f"secret_key = {format_field(secret_key)}\n",
+        f"wa_commitment = {format_field(wa_commitment)}\n",
+        f"ct_commitment = {format_field(ct_commitment)}\n",
+        f"c0_packed = {format_toml_array(c0_packed)}\n",
+        f"c1_packed = {format_toml_array(c1_packed)}\n",
+        f"r = {format_toml_array(r_signed)}\n",
+        f"e1_sparse = {format_toml_array(e1_signed)}\n",
+        f"e2 = {format_toml_array(e2_signed)}\n",
+        f"k0 = {format_toml_array(k0_list)}\n",
+        f"k1 = {format_toml_array(k1_list)}\n",
+    ])
+    write_if_changed(toml_path, prover_toml)
     print(f"Prover.toml written ({os.path.getsize(toml_path) / 1024:.1f} KB)")
 
     # Step 6: Compile + sunspot pipeline
     print("\n=== Step 6: nargo compile ===")
     t0 = time.time()
-    subprocess.run([NARGO, "compile"], cwd=CIRCUIT_DIR, check=True)
+    compiled = nargo_compile_cached(NARGO, CIRCUIT_DIR, "rlwe_audit", AUDIT_NARGO_TOML + circuit + pk_const)
     t_compile = time.time() - t0
-    print(f"nargo compile: {t_compile:.1f}s")
+    print(f"nargo compile: {t_compile:.1f}s" + ("" if compiled else " (sources unchanged, cached)"))
+
+    target_dir = os.path.join(CIRCUIT_DIR, "target")
+    acir_file = os.path.join(target_dir, "rlwe_audit.json")
+    witness_file = os.path.join(target_dir, "rlwe_audit.gz")
 
+    # The witness is a function of the toolchain, circuit and Prover.toml alone, so an
+    # unchanged triple reuses the last rlwe_audit.gz; the hash is kept in <CIRCUIT_DIR>/.witness_hash
     print("\n=== Step 7: nargo execute ===")
     t0 = time.time()
-    subprocess.run([NARGO, "execute"], cwd=CIRCUIT_DIR, check=True)
+    witness_hash = hashlib.sha256("\0".join(
+        [nargo_version(NARGO), AUDIT_NARGO_TOML + circuit + pk_const, prover_toml]).encode()).hexdigest()
+    witness_hash_path = os.path.join(CIRCUIT_DIR, ".witness_hash")
+    executed = True
+    if os.path.exists(witness_file) and os.path.exists(witness_hash_path):
+        with open(witness_hash_path) as f:
+            executed = f.read() != witness_hash
+    if executed:
+        subprocess.run([NARGO, "execute"], cwd=CIRCUIT_DIR, check=True)
+        with open(witness_hash_path, "w") as f:
+            f.write(witness_hash)
     t_execute = time.time() - t0
-    print(f"nargo execute: {t_execute:.1f}s")
+    print(f"nargo execute: {t_execute:.1f}s" + ("" if executed else " (inputs unchanged, cached)"))
 
-    target_dir = os.path.join(CIRCUIT_DIR, "target")
-    acir_file = os.path.join(target_dir, "rlwe_audit.json")
-    witness_file = os.path.join(target_dir, "rlwe_audit.gz")
+    # .ccs/.pk/.vk depend only on the circuit, so they are reused while the ACIR is unchanged
+    with open(acir_file, "rb") as f:
+        acir_hash = hashlib.sha256(f.read()).hexdigest()
+    cache_dir = os.path.join(CIRCUIT_DIR, "artifacts_cache", acir_hash)
+    cached = restore_sunspot_artifacts(cache_dir, target_dir, "rlwe_audit")
+    ccs_file = acir_file.replace(".json", ".ccs")
+    pk_file = ccs_file.replace(".ccs", ".pk")
+    vk_file = ccs_file.replace(".ccs", ".vk")
 
     print("\n=== Step 8: sunspot compile ===")
     t0 = time.time()
-    subprocess.run([SUNSPOT, "compile", acir_file], check=True)
+    if not cached:
+        subprocess.run([SUNSPOT, "compile", acir_file], check=True)
     t_sunspot_compile = time.time() - t0
-    ccs_file = acir_file.replace(".json", ".ccs")
     ccs_size = os.path.getsize(ccs_file) / 1024 / 1024
-    print(f"sunspot compile: {t_sunspot_compile:.1f}s, .ccs = {ccs_size:.1f} MB")
+    print(f"sunspot compile: {t_sunspot_compile:.1f}s, .ccs = {ccs_size:.1f} MB" + (" (cached)" if cached else ""))
 
     print("\n=== Step 9: sunspot setup ===")
     t0 = time.time()
-    subprocess.run([SUNSPOT, "setup", ccs_file], check=True)
+    if not cached:
+        subprocess.run([SUNSPOT, "setup", ccs_file], check=True)
+        store_sunspot_artifacts(cache_dir, target_dir, "rlwe_audit")
     t_setup = time.time() - t0
-    pk_file = ccs_file.replace(".ccs", ".pk")
-    vk_file = ccs_file.replace(".ccs", ".vk")
     pk_size = os.path.getsize(pk_file) / 1024 / 1024
-    print(f"sunspot setup: {t_setup:.1f}s, pk = {pk_size:.1f} MB")
+    print(f"sunspot setup: {t_setup:.1f}s, pk = {pk_size:.1f} MB" + (f" (cached, {acir_hash[:12]})" if cached else ""))
 
     print("\n=== Step 10: sunspot prove ===")
     t0 = time.time()
@@ -686,15 +771,19 @@ poseidon = { tag = "v0.1.1", git = "https://github.com/noir-lang/poseidon" }
 
     print("\n=== Step 11: sunspot verify ===")
     t0 = time.time()
-    subprocess.run([SUNSPOT, "verify", vk_file, proof_file, pw_file], check=True)
-    t_verify = time.time() - t0
-    print(f"sunspot verify: {t_verify:.1f}s")
+    verify = subprocess.Popen([SUNSPOT, "verify", vk_file, proof_file, pw_file])
 
-    # Copy artifacts
-    print("\n=== Step 12: Copy artifacts ===")
+    # The copy only needs the setup outputs, so it runs while verify does
     os.makedirs(ARTIFACTS_DIR, exist_ok=True)
     shutil.copy2(ccs_file, os.path.join(ARTIFACTS_DIR, "audit_circuit.ccs"))
     shutil.copy2(vk_file, os.path.join(ARTIFACTS_DIR, "audit_circuit.vk"))
+
+    if verify.wait() != 0:
+        raise subprocess.CalledProcessError(verify.returncode, verify.args)
+    t_verify = time.time() - t0
+    print(f"sunspot verify: {t_verify:.1f}s")
+
+    print("\n=== Step 12: Copy artifacts ===")
     print(f"Copied .ccs and .vk to {ARTIFACTS_DIR}/")
 
     # Summary
@@ -717,4 +806,8 @@ poseidon = { tag = "v0.1.1", git = "https://github.com/noir-lang/poseidon" }
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check-helpers", action="store_true",
+                        help="also run the bjj_helper_p1 / ct_helper_v2 circuits and cross-check their outputs")
+    args = parser.parse_args()
+    main(check_helpers=args.check_helpers)
@@ -0,0 +1,38 @@
+"""Grumpkin, Noir's embedded curve: y^2 = x^3 - 17 over the BN254 scalar field.
+
+Affine arithmetic in Python ints, shared by generate_audit.py and benchmark_all.py.
+GRUMPKIN_G is the generator fixed_base_scalar_mul uses; the group order is the BN254
+base field modulus, which is larger than BN254_P.
+"""
+from poseidon2_bn254 import BN254_P
+
+GRUMPKIN_G = (1, 17631683881184975370165255887551781615748388533673675138860)
+GRUMPKIN_ORDER = 21888242871839275222246405745257275088696311157297823662689037894645226208583
+
+
+def grumpkin_add(p1, p2):
+    """Affine Grumpkin point addition; None is the point at infinity."""
+    if p1 is None:
+        return p2
+    if p2 is None:
+        return p1
+    (x1, y1), (x2, y2) = p1, p2
+    if x1 == x2:
+        if (y1 + y2) % BN254_P == 0:
+            return None
+        lam = 3 * x1 * x1 * pow(2 * y1, -1, BN254_P) % BN254_P
+    else:
+        lam = (y2 - y1) * pow(x2 - x1, -1, BN254_P) % BN254_P
+    x3 = (lam * lam - x1 - x2) % BN254_P
+    return x3, (lam * (x1 - x3) - y1) % BN254_P
+
+
+def grumpkin_mul(scalar, point=GRUMPKIN_G):
+    """scalar * point by double-and-add."""
+    acc = None
+    while scalar:
+        if scalar & 1:
+            acc = grumpkin_add(acc, point)
+        point = grumpkin_add(point, point)
+        scalar >>= 1
+    return acc
@@ -0,0 +1,41 @@
+"""Run nargo / sunspot and pick values out of their output.
+
+Shared by generate_audit.py and benchmark_all.py so both parse helper circuit outputs
+and constraint counts the same way.
+"""
+import os
+import re
+import subprocess
+from collections import deque
+
+CIRCUIT_OUT_TRIPLE_RE = re.compile(r'Circuit output:\s*\((0x[0-9a-fA-F]+),\s*(0x[0-9a-fA-F]+),\s*(0x[0-9a-fA-F]+)\)')
+CIRCUIT_OUT_RE = re.compile(r'Circuit output:\s*(0x[0-9a-fA-F]+)')
+NB_CONSTRAINTS_RE = re.compile(r'nbConstraints=(\d+)')
+
+
+def run_search(cmd, pattern, cwd=None):
+    """Run cmd and return (first match of the compiled `pattern`, output tail).
+
+    stdout and stderr are merged and streamed line by line instead of buffered;
+    only a short tail is kept for error messages. Raises CalledProcessError on a
+    non-zero exit, like subprocess.run(check=True).
+    """
+    match = None
+    tail = deque(maxlen=20)
+    with subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE,
+                          stderr=subprocess.STDOUT, text=True) as proc:
+        for line in proc.stdout:
+            if match is None:
+                match = pattern.search(line)
+            tail.append(line)
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, proc.args, output="".join(tail))
+    return match, "".join(tail)
+
+
+def nargo_execute_search(nargo, package_dir, pattern):
+    """Run `nargo execute` and return the first match of the compiled `pattern` in its output."""
+    match, tail = run_search([nargo, "execute"], pattern, cwd=package_dir)
+    if not match:
+        raise RuntimeError(f"Could not parse {os.path.basename(package_dir)} output: {tail}")
+    return match
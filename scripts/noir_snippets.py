@@ -0,0 +1,18 @@
+"""Noir helper functions emitted verbatim by both generate_audit.py and benchmark_all.py.
+
+Plain strings (no format fields), so they can be dropped into either generator's
+f-string templates as {NAME}.
+"""
+
+# Every value in [-128, 128). Packing several shifted values into one Field and
+# decomposing that is not sound (a carry out of one slot can cancel a borrow from the
+# next), so each value gets its own 8-bit range constraint; unlike a discarded `as u8`
+# cast, which only truncates, assert_max_bit_size actually fails out of range.
+RANGE_PROOF_SIGNED_BATCH = """// Every value in [-128, 128), each with its own 8-bit range constraint
+// (see scripts/noir_snippets.py).
+fn range_proof_signed_batch<let K: u32>(values: [Field; K]) {
+    for i in 0..K {
+        (values[i] + 128).assert_max_bit_size::<8>();
+    }
+}
+"""
@@ -0,0 +1,55 @@
+"""Poseidon (original) over BN254, t = 3: Python twin of dep::poseidon's bn254::hash_2.
+
+That library uses the circomlib instance: x^5 S-box, 8 full and 57 partial rounds, a
+Cauchy MDS matrix. Round constants and the matrix come from the same Grain LFSR as
+poseidon2_bn254 (constants first, then the 2t matrix seeds); the known-answer check
+below pins them.
+"""
+from functools import lru_cache
+
+from poseidon2_bn254 import BN254_P, FIELD_BITS, grain_bits, grain_field_elements
+
+T = 3
+ROUNDS_F = 8
+ROUNDS_P = 57
+
+# hash_2([1, 2]) from circomlib / noir-lang/poseidon
+_KAT_HASH_1_2 = 7853200120776062878684798364095072458815029376092732009249414926327459813530
+
+
+@lru_cache(maxsize=1)
+def parameters():
+    """(round constants, T per round for ROUNDS_F + ROUNDS_P rounds; MDS matrix)."""
+    bits = grain_bits(T, ROUNDS_F, ROUNDS_P)
+    flat = grain_field_elements(bits, (ROUNDS_F + ROUNDS_P) * T)
+    constants = [tuple(flat[r * T:(r + 1) * T]) for r in range(ROUNDS_F + ROUNDS_P)]
+    # Matrix seeds are drawn without rejection sampling, reduced mod p
+    seeds = [int("".join(str(next(bits)) for _ in range(FIELD_BITS)), 2) % BN254_P for _ in range(2 * T)]
+    xs, ys = seeds[:T], seeds[T:]
+    assert len(set(seeds)) == 2 * T and all((x + y) % BN254_P for x in xs for y in ys)
+    mds = [[pow(x + y, BN254_P - 2, BN254_P) for y in ys] for x in xs]
+    return constants, mds
+
+
+def permutation(state):
+    """Poseidon permutation of T field elements."""
+    p = BN254_P
+    constants, mds = parameters()
+    s = [v % p for v in state]
+    half = ROUNDS_F // 2
+    for r, rc in enumerate(constants):
+        s = [(v + c) % p for v, c in zip(s, rc)]
+        if r < half or r >= half + ROUNDS_P:
+            s = [pow(v, 5, p) for v in s]
+        else:
+            s[0] = pow(s[0], 5, p)
+        s = [sum(m * v for m, v in zip(row, s)) % p for row in mds]
+    return s
+
+
+def hash_2(inputs):
+    """Poseidon hash of two field elements: capacity element 0, then state[0] of the permutation."""
+    return permutation([0, inputs[0], inputs[1]])[0]
+
+
+assert hash_2([1, 2]) == _KAT_HASH_1_2, "Poseidon round constants do not match the reference"
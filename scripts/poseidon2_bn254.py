@@ -0,0 +1,114 @@
+"""Poseidon2 permutation over BN254, t = 4: Python twin of Noir's std::hash::poseidon2_permutation.
+
+Parameters follow the Poseidon2 paper / barretenberg instance: x^5 S-box, 8 full rounds
+(4 before and 4 after) and 56 partial rounds. Round constants are regenerated from the
+reference Grain LFSR instead of being pasted in; the known-answer check below pins them.
+"""
+from functools import lru_cache
+
+BN254_P = 21888242871839275222246405745257275088548364400416034343698204186575808495617
+T = 4
+ROUNDS_F = 8
+ROUNDS_P = 56
+FIELD_BITS = 254
+
+# Internal matrix is 1 + diag(INTERNAL_DIAG - 1): state[i] * INTERNAL_DIAG[i] + sum(state)
+INTERNAL_DIAG = (
+    0x10dc6e9c006ea38b04b1e03b4bd9490c0d03f98929ca1d7fb56821fd19d3b6e7,
+    0x0c28145b6a44df3e0149b3d0a30b3bb599df9756d4dd9b84a86b38cfb45a740b,
+    0x00544b8338791518b2c7645a50392798b21f75bb60e3596170067d00141cac15,
+    0x222c01175718386f2e2e82eb122789e352e105a3b8fa852613bc534433ee428b,
+)
+
+# permutation([0, 1, 2, 3])[0] from the reference implementation
+_KAT_OUT0 = 0x01bd538c2ee014ed5141b29e9ae240bf8db3fe5b9a38629a9647cf8d76c01737
+
+
+def grain_bits(t, rounds_f, rounds_p):
+    """Grain LFSR bit stream used to derive Poseidon(2) round constants (field = prime, x^alpha S-box)."""
+    init = "01" + "0000" + f"{FIELD_BITS:012b}" + f"{t:012b}" + f"{rounds_f:010b}" + f"{rounds_p:010b}" + "1" * 30
+    state = [int(b) for b in init]
+
+    def step():
+        bit = state[62] ^ state[51] ^ state[38] ^ state[23] ^ state[13] ^ state[0]
+        state.pop(0)
+        state.append(bit)
+        return bit
+
+    for _ in range(160):
+        step()
+    while True:
+        # Self-shrinking: a 1 emits the following bit, a 0 discards it
+        while step() == 0:
+            step()
+        yield step()
+
+
+def grain_field_elements(bits, count):
+    """count field elements from the Grain stream, rejection-sampled below BN254_P."""
+    out = []
+    while len(out) < count:
+        v = int("".join(str(next(bits)) for _ in range(FIELD_BITS)), 2)
+        if v < BN254_P:
+            out.append(v)
+    return out
+
+
+@lru_cache(maxsize=1)
+def round_constants():
+    """ROUNDS_F full rounds of T constants around ROUNDS_P partial rounds of one constant each."""
+    flat = grain_field_elements(grain_bits(T, ROUNDS_F, ROUNDS_P), ROUNDS_F * T + ROUNDS_P)
+    half = ROUNDS_F // 2
+    full_first = [tuple(flat[r * T:(r + 1) * T]) for r in range(half)]
+    partial = flat[half * T:half * T + ROUNDS_P]
+    rest = flat[half * T + ROUNDS_P:]
+    full_last = [tuple(rest[r * T:(r + 1) * T]) for r in range(half)]
+    return full_first, partial, full_last
+
+
+def _external(s):
+    """barretenberg's 4x4 external MDS matrix [[5,7,1,3],[4,6,1,1],[1,3,5,7],[1,1,4,6]]."""
+    t0 = s[0] + s[1]
+    t1 = s[2] + s[3]
+    t2 = 2 * s[1] + t1
+    t3 = 2 * s[3] + t0
+    t4 = 4 * t1 + t3
+    t5 = 4 * t0 + t2
+    return [(t3 + t5) % BN254_P, t5 % BN254_P, (t2 + t4) % BN254_P, t4 % BN254_P]
+
+
+def permutation(state):
+    """Poseidon2 permutation of 4 field elements; same result as poseidon2_permutation(state, 4)."""
+    p = BN254_P
+    full_first, partial, full_last = round_constants()
+    s = _external([v % p for v in state])
+    for rc in full_first:
+        s = _external([pow((v + c) % p, 5, p) for v, c in zip(s, rc)])
+    for c in partial:
+        s[0] = pow((s[0] + c) % p, 5, p)
+        total = sum(s)
+        s = [(v * d + total) % p for v, d in zip(s, INTERNAL_DIAG)]
+    for rc in full_last:
+        s = _external([pow((v + c) % p, 5, p) for v, c in zip(s, rc)])
+    return s
+
+
+def sponge_rate3(elems):
+    """Rate-3 / capacity-1 sponge over elems, as in the audit circuit's compute_ct_commitment.
+
+    Absorbs 3 elements per permutation; a final permutation always follows the
+    (possibly empty) partial block, and state[0] is the digest.
+    """
+    state = [0] * T
+    full_rounds = len(elems) // 3
+    for i in range(full_rounds):
+        state[0] += elems[3 * i]
+        state[1] += elems[3 * i + 1]
+        state[2] += elems[3 * i + 2]
+        state = permutation(state)
+    for j, v in enumerate(elems[3 * full_rounds:]):
+        state[j] += v
+    return permutation(state)[0]
+
+
+assert permutation([0, 1, 2, 3])[0] == _KAT_OUT0, "Poseidon2 round constants do not match the reference"
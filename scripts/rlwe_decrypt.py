@@ -9,46 +9,63 @@ BFV convention: b = -(a*sk) + e_pk (mod q)
   Recover: msg[i] = round(noisy[i] / Delta) mod t
 """
 import os
+import base64
 import json
 
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json with the same compact output
+    orjson = None
+
+from negacyclic_ntt import negacyclic_mul_ntt
+from shamir import BN254_P, lagrange_basis_at_zero
+
 N = 1024
 MSG_SLOTS = 64
 RLWE_Q = 167772161
 PLAINTEXT_MOD = 256
 DELTA = RLWE_Q // PLAINTEXT_MOD  # 655360
-BN254_P = 21888242871839275222246405745257275088548364400416034343698204186575808495617
+
+# False: multiply with the table-free NumPy convolution instead of the NTT
+USE_NTT = True
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJ_DIR = os.path.dirname(BASE_DIR)
 KEYS_DIR = os.path.join(PROJ_DIR, "demo-frontend", "public", "rlwe")
 
 
-def negacyclic_mul_mod_q(a, b, n, q):
-    result = [0] * n
-    for i in range(n):
-        for j in range(n):
-            idx = i + j
-            if idx < n:
-                result[idx] = (result[idx] + a[i] * b[j]) % q
-            else:
-                result[idx - n] = (result[idx - n] - a[i] * b[j]) % q
-    return result
+def negacyclic_mul_conv(a, b, n, q):
+    """O(n^2) negacyclic multiplication mod q as one np.convolve per half of b, no NTT tables.
+
+    b is split into 14-bit halves so every int64 convolution sum stays below n * q * 2^14;
+    the x^n = -1 wrap folds the high half of the full product back with a sign flip.
+    """
+    a = np.asarray(a, dtype=np.int64) % q
+    b = np.asarray(b, dtype=np.int64) % q
+
+    def fold(half):
+        full = np.convolve(a, half)
+        res = full[:n].copy()
+        res[:n - 1] -= full[n:]
+        return res % q
+
+    return ((fold(b >> 14) * (1 << 14) + fold(b & 0x3FFF)) % q).tolist()
+
 
+def load_json(path):
+    """Parse the JSON file at path; C-level decoding through orjson when available."""
+    with open(path, "rb") as f:
+        data = f.read()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
 
-def shamir_reconstruct_field(shares, threshold):
-    secret = 0
-    xs = [s[0] for s in shares[:threshold]]
-    ys = [s[1] for s in shares[:threshold]]
 
-    for i in range(threshold):
-        num = ys[i]
-        for j in range(threshold):
-            if i != j:
-                num = num * (-xs[j]) % BN254_P
-                inv = pow(xs[i] - xs[j], BN254_P - 2, BN254_P)
-                num = num * inv % BN254_P
-        secret = (secret + num) % BN254_P
-    return secret
+def decode_share_ys(share):
+    """y values of a share file: base64 32-byte big-endian, or hex for files without "y_encoding"."""
+    if share.get("y_encoding", "hex") == "base64":
+        return [int.from_bytes(base64.b64decode(c["y"]), "big") for c in share["coefficients"]]
+    return [int(c["y"], 16) for c in share["coefficients"]]
 
 
 def centered_mod(v, q):
@@ -64,19 +81,19 @@ def main():
     shares = []
     for idx in [1, 2]:
         path = os.path.join(KEYS_DIR, "rlwe_sk_shares", f"share_{idx}.json")
-        with open(path) as f:
-            data = json.load(f)
-        shares.append(data)
+        shares.append(load_json(path))
     threshold = shares[0]["threshold"]
 
-    # Reconstruct sk over BN254, then convert to mod q
+    # Reconstruct sk over BN254, then convert to mod q. Every coefficient of a share
+    # file has the same x, so the Lagrange basis is computed once for all N of them.
+    coeffs = [share["coefficients"] for share in shares[:threshold]]
+    xs = [c[0]["x"] for c in coeffs]
+    assert all(c[i]["x"] == x for c, x in zip(coeffs, xs) for i in range(N)), "share x values differ"
+    lambdas = lagrange_basis_at_zero(xs)
+    ys = [decode_share_ys(share) for share in shares[:threshold]]
     sk_bn254 = []
     for coeff_idx in range(N):
-        s1 = (shares[0]["coefficients"][coeff_idx]["x"],
-               int(shares[0]["coefficients"][coeff_idx]["y"], 16))
-        s2 = (shares[1]["coefficients"][coeff_idx]["x"],
-               int(shares[1]["coefficients"][coeff_idx]["y"], 16))
-        val = shamir_reconstruct_field([s1, s2], threshold)
+        val = sum(lam * y[coeff_idx] for lam, y in zip(lambdas, ys)) % BN254_P
         sk_bn254.append(val)
 
     # Convert to mod q (small values: originally in [-3, 3])
@@ -90,8 +107,7 @@ def main():
     # Step 2: Load ciphertext
     print("\n=== Step 2: Load ciphertext ===")
     ct_path = os.path.join(KEYS_DIR, "ciphertext.json")
-    with open(ct_path) as f:
-        ct_data = json.load(f)
+    ct_data = load_json(ct_path)
     c0_sparse = ct_data["c0_sparse"]  # already integers (mod q)
     c1 = ct_data["c1"]
     expected_owner_x = int(ct_data["expected_owner_x"], 16)
@@ -101,7 +117,7 @@ def main():
     # Step 3: Decrypt: (c0 + sk*c1) mod q = Delta*msg + noise
     print("\n=== Step 3: Decrypt ===")
     print("Computing sk * c1 (negacyclic mul mod q)...")
-    sk_c1 = negacyclic_mul_mod_q(sk_mod_q, c1, N, RLWE_Q)
+    sk_c1 = (negacyclic_mul_ntt if USE_NTT else negacyclic_mul_conv)(sk_mod_q, c1, N, RLWE_Q)
 
     msg_recovered = []
     for i in range(MSG_SLOTS):
@@ -118,12 +134,9 @@ def main():
 
     # Step 4: Decode back to owner_x, owner_y (8-bit byte slots)
     print("\n=== Step 4: Decode owner_x, owner_y ===")
-    recovered_owner_x = 0
-    for i in range(32):
-        recovered_owner_x += (msg_recovered[i] & 0xFF) << (i * 8)
-    recovered_owner_y = 0
-    for i in range(32):
-        recovered_owner_y += (msg_recovered[32 + i] & 0xFF) << (i * 8)
+    # Slots are little-endian bytes of owner_x (0..31) then owner_y (32..63)
+    recovered_owner_x = int.from_bytes(bytes(v & 0xFF for v in msg_recovered[:32]), "little")
+    recovered_owner_y = int.from_bytes(bytes(v & 0xFF for v in msg_recovered[32:64]), "little")
 
     print(f"Expected  owner_x = {hex(expected_owner_x)}")
     print(f"Recovered owner_x = {hex(recovered_owner_x)}")
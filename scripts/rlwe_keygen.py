@@ -11,14 +11,26 @@ Generates:
   demo-frontend/public/rlwe/rlwe_sk_shares/    - Shamir shares of sk (over BN254)
 """
 import os
+import argparse
+import base64
 import json
 import random
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json with the same compact output
+    orjson = None
+
+from negacyclic_ntt import negacyclic_mul_ntt
+from shamir import BN254_P, lagrange_basis_at_zero, mpz, shamir_share_fields
 
 N = 1024
 NOISE_BOUND = 3
 RLWE_Q = 167772161  # 40 * 2^22 + 1, NTT-friendly prime
-BN254_P = 21888242871839275222246405745257275088548364400416034343698204186575808495617
 
 # Shamir params
 THRESHOLD = 2
@@ -29,102 +41,82 @@ PROJ_DIR = os.path.dirname(BASE_DIR)
 KEYS_DIR = os.path.join(PROJ_DIR, "demo-frontend", "public", "rlwe")
 
 
-def negacyclic_mul_mod_q(a, b, n, q):
-    """Negacyclic polynomial multiplication mod q."""
-    result = [0] * n
-    for i in range(n):
-        for j in range(n):
-            idx = i + j
-            if idx < n:
-                result[idx] = (result[idx] + a[i] * b[j]) % q
-            else:
-                result[idx - n] = (result[idx - n] - a[i] * b[j]) % q
-    return result
-
-
 def small_noise(rng):
     """Small noise in [-NOISE_BOUND, NOISE_BOUND], returned mod q."""
     v = rng.randint(-NOISE_BOUND, NOISE_BOUND)
     return v % RLWE_Q
 
 
-def shamir_share_field(secret, threshold, num_shares, rng):
-    """Shamir secret sharing of a single field element over BN254."""
-    coeffs = [secret % BN254_P]
-    for _ in range(threshold - 1):
-        coeffs.append(rng.randint(0, BN254_P - 1))
-
-    shares = []
-    for i in range(1, num_shares + 1):
-        val = 0
-        x_pow = 1
-        for c in coeffs:
-            val = (val + c * x_pow) % BN254_P
-            x_pow = (x_pow * i) % BN254_P
-        shares.append((i, val))
-    return shares
-
-
-def shamir_reconstruct_field(shares, threshold):
-    """Lagrange interpolation at x=0 to recover secret."""
-    secret = 0
-    xs = [s[0] for s in shares[:threshold]]
-    ys = [s[1] for s in shares[:threshold]]
-
-    for i in range(threshold):
-        num = ys[i]
-        for j in range(threshold):
-            if i != j:
-                num = num * (-xs[j]) % BN254_P
-                inv = pow(xs[i] - xs[j], BN254_P - 2, BN254_P)
-                num = num * inv % BN254_P
-        secret = (secret + num) % BN254_P
-    return secret
-
-
 def to_hex_q(v):
     """Hex representation for values mod q."""
     v = v % RLWE_Q
     return f"0x{v:08x}"
 
 
-def to_hex_bn254(v):
-    v = v % BN254_P
-    if v == 0:
-        return "0x0"
-    return f"0x{v:064x}"
+def to_b64_bn254(v):
+    """Base64 of the 32-byte big-endian encoding (share_*.json "y_encoding": "base64")."""
+    return base64.b64encode(int(v % BN254_P).to_bytes(32, "big")).decode()
+
 
+def dump_json(obj, path):
+    """Write obj as compact JSON; C-level encoding through orjson when available."""
+    data = orjson.dumps(obj) if orjson is not None else json.dumps(obj, separators=(",", ":")).encode()
+    with open(path, "wb") as f:
+        f.write(data)
 
-def main():
+
+def write_share(share_idx, shares, shares_dir):
+    """Serialize one share's (x, y) list to shares_dir/share_<idx + 1>.json; returns the path."""
+    share_path = os.path.join(shares_dir, f"share_{share_idx + 1}.json")
+    dump_json({
+        "share_index": share_idx + 1,
+        "threshold": THRESHOLD,
+        "num_shares": NUM_SHARES,
+        "y_encoding": "base64",
+        "coefficients": [{"x": x, "y": to_b64_bn254(y)} for x, y in shares],
+    }, share_path)
+    return share_path
+
+
+def main(fast_regen=False, sample_verify=0):
+    """fast_regen draws the uniform pk polynomial a with NumPy's PCG64 in one call; the keys
+    then differ from the random.Random(42) ones checked into demo-frontend.
+
+    sample_verify > 0 reconstructs only that many randomly chosen coefficients in the
+    final self-check instead of all N.
+    """
     rng = random.Random(42)
 
     print(f"=== RLWE Keygen (N={N}, q={RLWE_Q}) ===")
 
     # Generate secret key: small polynomial with coeffs in [-NOISE_BOUND, NOISE_BOUND]
-    sk_signed = [rng.randint(-NOISE_BOUND, NOISE_BOUND) for _ in range(N)]
-    sk_mod_q = [v % RLWE_Q for v in sk_signed]
-    print(f"sk generated: {sum(1 for s in sk_signed if s != 0)} nonzero coefficients")
+    # Signed small polynomials are kept as one int8 array; the mod q view is derived in one op
+    sk_signed = np.array([rng.randint(-NOISE_BOUND, NOISE_BOUND) for _ in range(N)], dtype=np.int8)
+    sk_mod_q = sk_signed.astype(np.int64) % RLWE_Q
+    print(f"sk generated: {np.count_nonzero(sk_signed)} nonzero coefficients")
 
     # Generate public key mod q: a random in [0, q), e small noise
     # b = -(a*sk) + e mod q  (BFV convention)
-    a = [rng.randint(0, RLWE_Q - 1) for _ in range(N)]
-    e_signed = [rng.randint(-NOISE_BOUND, NOISE_BOUND) for _ in range(N)]
-    e_mod_q = [v % RLWE_Q for v in e_signed]
+    if fast_regen:
+        a = np.random.default_rng(42).integers(0, RLWE_Q, N, dtype=np.int64).tolist()
+    else:
+        randbelow = rng.randrange
+        a = [randbelow(RLWE_Q) for _ in range(N)]
+    e_signed = np.array([rng.randint(-NOISE_BOUND, NOISE_BOUND) for _ in range(N)], dtype=np.int8)
 
     print("Computing a*sk (negacyclic mul mod q)...")
-    a_sk = negacyclic_mul_mod_q(a, sk_mod_q, N, RLWE_Q)
-    b = [((-a_sk[i]) + e_mod_q[i]) % RLWE_Q for i in range(N)]
+    a_sk = np.array(negacyclic_mul_ntt(a, sk_mod_q, N, RLWE_Q), dtype=np.int64)
+    b = ((e_signed - a_sk) % RLWE_Q).tolist()
 
     print("Public key generated.")
 
     # Save pk (coefficients in [0, q))
     os.makedirs(KEYS_DIR, exist_ok=True)
     pk_path = os.path.join(KEYS_DIR, "rlwe_pk.json")
-    with open(pk_path, "w") as f:
-        json.dump({
-            "a": [to_hex_q(v) for v in a],
-            "b": [to_hex_q(v) for v in b],
-        }, f)
+    dump_json({
+        "a": [to_hex_q(v) for v in a],
+        "b": [to_hex_q(v) for v in b],
+    }, pk_path)
     print(f"PK saved to {pk_path} ({os.path.getsize(pk_path) / 1024:.1f} KB)")
 
     # Save params
@@ -145,44 +137,38 @@ def main():
     # Shamir secret sharing of sk over BN254
     # sk coeffs are small signed values; represent in BN254 field
     print(f"\n=== Shamir Secret Sharing ({THRESHOLD}-of-{NUM_SHARES}) ===")
-    sk_bn254 = [v % BN254_P for v in sk_signed]  # signed -> BN254 field
-
-    all_shares = [[] for _ in range(NUM_SHARES)]
+    sk_bn254 = [mpz(v) % BN254_P for v in sk_signed.tolist()]  # signed -> BN254 field
 
-    for coeff_idx in range(N):
-        shares = shamir_share_field(sk_bn254[coeff_idx], THRESHOLD, NUM_SHARES, rng)
-        for share_idx in range(NUM_SHARES):
-            all_shares[share_idx].append(shares[share_idx])
+    all_shares = shamir_share_fields(sk_bn254, THRESHOLD, NUM_SHARES, rng)
 
     shares_dir = os.path.join(KEYS_DIR, "rlwe_sk_shares")
     os.makedirs(shares_dir, exist_ok=True)
-    for share_idx in range(NUM_SHARES):
-        share_path = os.path.join(shares_dir, f"share_{share_idx + 1}.json")
-        share_data = {
-            "share_index": share_idx + 1,
-            "threshold": THRESHOLD,
-            "num_shares": NUM_SHARES,
-            "coefficients": [
-                {"x": all_shares[share_idx][i][0], "y": to_hex_bn254(all_shares[share_idx][i][1])}
-                for i in range(N)
-            ]
-        }
-        with open(share_path, "w") as f:
-            json.dump(share_data, f)
+    with ThreadPoolExecutor(max_workers=NUM_SHARES) as pool:
+        share_paths = list(pool.map(
+            lambda share_idx: write_share(share_idx, all_shares[share_idx], shares_dir), range(NUM_SHARES)))
+    for share_idx, share_path in enumerate(share_paths):
         print(f"Share {share_idx + 1} saved to {share_path} ({os.path.getsize(share_path) / 1024:.1f} KB)")
 
     # Verify: reconstruct from shares 1,2 and check against sk
     print("\n=== Verification: reconstruct sk from shares 1,2 ===")
-    for coeff_idx in range(N):
-        recovered = shamir_reconstruct_field(
-            [all_shares[0][coeff_idx], all_shares[1][coeff_idx]],
-            THRESHOLD
-        )
+    lambdas = lagrange_basis_at_zero([all_shares[0][0][0], all_shares[1][0][0]])
+    # Drawn after every key/share value, so sampling does not change the generated keys
+    check_idxs = sorted(rng.sample(range(N), sample_verify)) if 0 < sample_verify < N else range(N)
+    for coeff_idx in check_idxs:
+        recovered = (lambdas[0] * all_shares[0][coeff_idx][1] + lambdas[1] * all_shares[1][coeff_idx][1]) % BN254_P
         assert recovered == sk_bn254[coeff_idx], f"Mismatch at coeff {coeff_idx}"
-    print("Full reconstruction verified (all 1024 coefficients).")
+    if len(check_idxs) == N:
+        print(f"Full reconstruction verified (all {N} coefficients).")
+    else:
+        print(f"Sampled reconstruction verified ({len(check_idxs)} of {N} coefficients).")
 
     print("\n=== Done ===")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fast-regen", action="store_true",
+                        help="draw the pk polynomial a with NumPy PCG64 (new keys, not the committed ones)")
+    parser.add_argument("--sample-verify", type=int, default=0, metavar="K",
+                        help="self-check only K random coefficients instead of all N")
+    main(**vars(parser.parse_args(sys.argv[1:])))
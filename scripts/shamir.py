@@ -0,0 +1,52 @@
+"""Shamir secret sharing over the BN254 scalar field, shared by rlwe_keygen.py and rlwe_decrypt.py.
+
+Shares are (x, y) pairs; any threshold of them recover the secret by Lagrange
+interpolation at x = 0.
+"""
+try:
+    from gmpy2 import mpz, invert
+except ImportError:  # optional: GMP-backed BN254 arithmetic, plain ints otherwise
+    mpz = int
+
+    def invert(x, m):
+        return pow(x, -1, m)
+
+BN254_P = mpz(21888242871839275222246405745257275088548364400416034343698204186575808495617)
+
+
+def shamir_share_fields(secrets, threshold, num_shares, rng):
+    """Shamir secret sharing of each field element in secrets over BN254.
+
+    Returns num_shares lists of (x, y) with x = 1..num_shares. The random higher
+    coefficients are drawn secret by secret, in the same order as sharing each
+    element on its own, and every share is evaluated with precomputed powers of x.
+    """
+    randbelow = rng.randrange  # randrange(n) draws the same stream as randint(0, n - 1)
+    higher = [[mpz(randbelow(BN254_P)) for _ in range(threshold - 1)] for _ in secrets]
+    all_shares = []
+    for x in range(1, num_shares + 1):
+        x_pows = [x ** d for d in range(1, threshold)]
+        all_shares.append([
+            (x, (mpz(secret) + sum(c * xp for c, xp in zip(coeffs, x_pows))) % BN254_P)
+            for secret, coeffs in zip(secrets, higher)
+        ])
+    return all_shares
+
+
+def lagrange_basis_at_zero(xs):
+    """lambda_i = prod_{j != i} -x_j / (x_i - x_j) mod BN254_P, so secret = sum(lambda_i * y_i)."""
+    lambdas = []
+    for i in range(len(xs)):
+        num, den = mpz(1), mpz(1)
+        for j in range(len(xs)):
+            if i != j:
+                num = num * (-xs[j]) % BN254_P
+                den = den * (xs[i] - xs[j]) % BN254_P
+        lambdas.append(num * invert(den, BN254_P) % BN254_P)
+    return lambdas
+
+
+def shamir_reconstruct_field(shares, threshold):
+    """Lagrange interpolation at x=0 to recover secret."""
+    lambdas = lagrange_basis_at_zero([s[0] for s in shares[:threshold]])
+    return sum(lam * s[1] for lam, s in zip(lambdas, shares)) % BN254_P
@@ -0,0 +1,50 @@
+"""write_if_changed and nargo_compile_cached, with a stand-in nargo that logs its calls."""
+import os
+import stat
+
+from build_cache import nargo_compile_cached, nargo_version, write_if_changed
+
+
+def fake_nargo(tmp_path):
+    """Executable that prints version.txt for --version, and otherwise appends its argv to
+    calls.log and writes target/pkg.json on compile."""
+    (tmp_path / "version.txt").write_text("nargo version = 1.0.0\n")
+    path = tmp_path / "nargo"
+    path.write_text('#!/bin/sh\n[ "$1" = --version ] && exec cat "$(dirname "$0")/version.txt"\n'
+                    'echo "$@" >> "$(dirname "$0")/calls.log"\n'
+                    '[ "$1" = compile ] && mkdir -p target && echo "{}" > target/pkg.json\nexit 0\n')
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path), tmp_path / "calls.log"
+
+
+def test_write_if_changed(tmp_path):
+    path = str(tmp_path / "main.nr")
+    assert write_if_changed(path, "fn main() {}\n")
+    assert not write_if_changed(path, "fn main() {}\n")
+    assert write_if_changed(path, "fn main() { }\n")
+    assert os.listdir(tmp_path) == ["main.nr"]
+
+
+def test_nargo_compile_cached_reruns_only_on_change(tmp_path):
+    nargo, log = fake_nargo(tmp_path)
+    package_dir = tmp_path / "pkg"
+    package_dir.mkdir()
+    assert nargo_compile_cached(nargo, str(package_dir), "pkg", "src v1", capture_output=True)
+    assert not nargo_compile_cached(nargo, str(package_dir), "pkg", "src v1", capture_output=True)
+    assert nargo_compile_cached(nargo, str(package_dir), "pkg", "src v2", capture_output=True)
+    (package_dir / "target" / "pkg.json").unlink()
+    assert nargo_compile_cached(nargo, str(package_dir), "pkg", "src v2", capture_output=True)
+    assert log.read_text().split() == ["compile"] * 3
+
+
+def test_nargo_compile_cached_reruns_on_new_toolchain(tmp_path):
+    nargo, log = fake_nargo(tmp_path)
+    package_dir = tmp_path / "pkg"
+    package_dir.mkdir()
+    nargo_version.cache_clear()
+    assert nargo_compile_cached(nargo, str(package_dir), "pkg", "src", capture_output=True)
+    assert not nargo_compile_cached(nargo, str(package_dir), "pkg", "src", capture_output=True)
+    (tmp_path / "version.txt").write_text("nargo version = 1.0.1\n")
+    nargo_version.cache_clear()
+    assert nargo_compile_cached(nargo, str(package_dir), "pkg", "src", capture_output=True)
+    assert log.read_text().split() == ["compile"] * 2
@@ -0,0 +1,43 @@
+"""derive_pk's BASE_TABLE decomposition, including scalars next to the group orders."""
+import pytest
+
+import benchmark_all
+from benchmark_all import BN254_P
+from grumpkin import GRUMPKIN_ORDER, grumpkin_add, grumpkin_mul
+
+
+def table_mul_no_degenerate_adds(k):
+    """The Noir derive_pk loop, failing if any addition would be a doubling or P + (-P)."""
+    table = benchmark_all.fixed_base_table()
+    kb = k.to_bytes(32, "little")
+    acc = table[0][kb[0]]
+    for i in range(1, 32):
+        entry = table[i][kb[i]]
+        if acc is not None and entry is not None:
+            assert acc[0] != entry[0], f"degenerate addition in window {i} for k={k:#x}"
+        acc = grumpkin_add(acc, entry)
+    return acc
+
+
+def test_group_order():
+    assert grumpkin_mul(GRUMPKIN_ORDER) is None
+    assert GRUMPKIN_ORDER > BN254_P
+
+
+@pytest.mark.parametrize("k", [
+    1,
+    255,
+    256,
+    (1 << 248) - 1,
+    1 << 248,
+    BN254_P - 1,
+    BN254_P - 2,
+    BN254_P - (1 << 248),
+    # Largest valid top byte, with every lower byte 0xff or 0x00
+    (BN254_P >> 248 << 248) - 1,
+    BN254_P >> 248 << 248,
+    12345,
+])
+def test_table_matches_grumpkin_mul(k):
+    assert 0 < k < BN254_P
+    assert table_mul_no_degenerate_adds(k) == grumpkin_mul(k)
@@ -0,0 +1,76 @@
+"""generate_audit's in-process owner key and ct_commitment against the Noir helpers."""
+import os
+import tomllib
+
+import pytest
+
+import generate_audit as G
+import poseidon2_bn254
+
+PROJ_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+HAVE_NARGO = os.path.exists(G.NARGO)
+
+
+def sample_packed():
+    c0_packed = G.pack_values([i * 7919 % G.RLWE_Q for i in range(G.MSG_SLOTS)])
+    c1_packed = G.pack_values([(i * 104729 + 3) % G.RLWE_Q for i in range(G.N)])
+    return c0_packed, c1_packed
+
+
+def test_derive_owner_pk_matches_prover_params():
+    # owner_x/owner_y/wa_commitment in client/prover-params.toml were produced by Noir
+    with open(os.path.join(PROJ_DIR, "client", "prover-params.toml"), "rb") as f:
+        params = tomllib.load(f)
+    expected = tuple(int(params[k], 16) for k in ("owner_x", "owner_y", "wa_commitment"))
+    assert G.derive_owner_pk(int(params["secret_key"], 16)) == expected
+
+
+# Poseidon2 (t = 4, BN254) permutation test vector for input [0, 1, 2, 3], from
+# barretenberg's poseidon2 permutation tests (the backend behind Noir's
+# std::hash::poseidon2_permutation). All four lanes pin the round constants, the
+# matrices and the 8 + 56 round counts the ct_commitment sponge depends on.
+BB_POSEIDON2_KAT_OUT = [
+    0x01bd538c2ee014ed5141b29e9ae240bf8db3fe5b9a38629a9647cf8d76c01737,
+    0x239b62e7db98aa3a2a8f6a0d2fa1709e7a35959aa6c7034814d9daa90cbac662,
+    0x04cbb44c61d928ed06808456bf758cbf0c18d1e15a7b6dbc8245fa7515d5e3cb,
+    0x2e11c5cff2a22c64d01304b778d78f6998eff1ab73163a35603f54794c30847a,
+]
+
+
+def test_poseidon2_permutation_matches_barretenberg():
+    assert poseidon2_bn254.permutation([0, 1, 2, 3]) == BB_POSEIDON2_KAT_OUT
+
+
+def test_compute_ct_commitment_absorbs_like_ct_helper_v2(monkeypatch):
+    # ct_helper_v2: 3 elements into lanes 0..2 per permutation, then the partial tail
+    # block and one final permutation; lane 3 (capacity) is never absorbed into
+    inputs = []
+    permutation = poseidon2_bn254.permutation
+
+    def spy(state):
+        inputs.append(list(state))
+        return permutation(state)
+
+    monkeypatch.setattr(poseidon2_bn254, "permutation", spy)
+    c0_packed, c1_packed = sample_packed()
+    packed = list(c0_packed) + list(c1_packed)
+    digest = G.compute_ct_commitment(c0_packed, c1_packed)
+
+    full_rounds, remainder = divmod(G.TOTAL_PACKED, 3)
+    assert len(inputs) == full_rounds + 1
+    state = [0] * 4
+    for i, absorbed in enumerate(inputs):
+        block = packed[3 * i:3 * i + 3]
+        assert absorbed == [s + v for s, v in zip(state, block + [0] * (4 - len(block)))]
+        state = permutation(absorbed)
+    assert len(packed[3 * full_rounds:]) == remainder
+    assert digest == state[0]
+
+
+@pytest.mark.skipif(not HAVE_NARGO, reason=f"nargo not installed at {G.NARGO}")
+def test_helpers_match_nargo(tmp_path, monkeypatch):
+    monkeypatch.setattr(G, "PROJ_DIR", str(tmp_path))
+    G.compile_helpers(["bjj_helper_p1", "ct_helper_v2"])
+    assert G.run_bjj_helper_poseidon1(12345) == G.derive_owner_pk(12345)
+    c0_packed, c1_packed = sample_packed()
+    assert G.run_ct_helper_v2(c0_packed, c1_packed) == G.compute_ct_commitment(c0_packed, c1_packed)
@@ -0,0 +1,23 @@
+"""benchmark_all.cached_helper_output misses whenever anything the helper ran with changes."""
+import benchmark_all
+
+
+def test_cache_key_covers_toolchain_and_sources(tmp_path, monkeypatch):
+    monkeypatch.setattr(benchmark_all, "PROJ_DIR", str(tmp_path))
+    version = ["nargo version = 1.0.0"]
+    monkeypatch.setattr(benchmark_all, "nargo_version", lambda nargo: version[0])
+    calls = []
+
+    def lookup(nargo_toml="toml", main_nr="main", prover_toml="prover"):
+        def compute():
+            calls.append(1)
+            return (len(calls),)
+        return benchmark_all.cached_helper_output(nargo_toml, main_nr, prover_toml, compute)
+
+    assert lookup() == (1,)
+    assert lookup() == (1,) and len(calls) == 1
+    assert lookup(nargo_toml="toml with a new dependency tag") == (2,)
+    assert lookup(main_nr="changed circuit") == (3,)
+    assert lookup(prover_toml="other input") == (4,)
+    version[0] = "nargo version = 1.0.1"
+    assert lookup() == (5,)
@@ -0,0 +1,31 @@
+"""run_search and the shared output regexes on a stand-in subprocess."""
+import subprocess
+import sys
+
+import pytest
+
+from nargo_output import CIRCUIT_OUT_RE, CIRCUIT_OUT_TRIPLE_RE, NB_CONSTRAINTS_RE, run_search
+
+
+def python_cmd(code):
+    return [sys.executable, "-c", code]
+
+
+def test_run_search_first_match_across_stdout_and_stderr():
+    code = ("import sys; print('noise'); print('Circuit output: 0x1f', file=sys.stderr); "
+            "print('Circuit output: 0x2a')")
+    match, tail = run_search(python_cmd(code), CIRCUIT_OUT_RE)
+    assert int(match.group(1), 16) == 0x1f
+    assert "noise" in tail
+
+
+def test_run_search_raises_on_failure():
+    with pytest.raises(subprocess.CalledProcessError) as exc:
+        run_search(python_cmd("print('boom'); raise SystemExit(3)"), CIRCUIT_OUT_RE)
+    assert exc.value.returncode == 3 and "boom" in exc.value.output
+
+
+def test_output_patterns():
+    assert CIRCUIT_OUT_TRIPLE_RE.search("Circuit output: (0x1, 0xAb, 0x3)").groups() == ("0x1", "0xAb", "0x3")
+    assert NB_CONSTRAINTS_RE.search("compiled nbConstraints=123456 x").group(1) == "123456"
+    assert run_search(python_cmd("print('nothing')"), NB_CONSTRAINTS_RE)[0] is None
@@ -0,0 +1,43 @@
+"""negacyclic_ntt against a schoolbook negacyclic product."""
+import numpy as np
+import pytest
+
+import negacyclic_ntt
+
+Q = 167772161
+
+
+def schoolbook(a, b, n, q):
+    result = [0] * n
+    for i in range(n):
+        for j in range(n):
+            if i + j < n:
+                result[i + j] = (result[i + j] + a[i] * b[j]) % q
+            else:
+                result[i + j - n] = (result[i + j - n] - a[i] * b[j]) % q
+    return result
+
+
+@pytest.mark.parametrize("n", [8, 64, 1024])
+def test_mul_matches_schoolbook(n):
+    rng = np.random.default_rng(n)
+    a = rng.integers(0, Q, n).tolist()
+    b = rng.integers(-3, 4, n).tolist()
+    expected = schoolbook(a, b, n, Q) if n <= 64 else None
+    if expected is not None:
+        assert negacyclic_ntt.negacyclic_mul_mod_q(a, b, n, Q) == expected
+    got = negacyclic_ntt.negacyclic_mul_ntt(a, b, n, Q)
+    if expected is not None:
+        assert got == expected
+    assert negacyclic_ntt.negacyclic_mul_ntt_many([a, b], b, n, Q) == [
+        got, negacyclic_ntt.negacyclic_mul_ntt(b, b, n, Q)]
+
+
+def test_layer_and_loop_paths_agree():
+    n = 256
+    psi_rev, psi_inv_rev, n_inv = negacyclic_ntt.ntt_tables(n, Q)
+    a = np.random.default_rng(0).integers(0, Q, n)
+    a_hat = negacyclic_ntt._ntt_layers(a.copy(), psi_rev, Q)
+    assert (negacyclic_ntt._ntt_loops(a.copy(), psi_rev, Q) == a_hat).all()
+    assert (negacyclic_ntt._intt_loops(a_hat.copy(), psi_inv_rev, n_inv, Q) == a).all()
+    assert (negacyclic_ntt._intt_layers(a_hat, psi_inv_rev, n_inv, Q) == a).all()
@@ -0,0 +1,62 @@
+"""range_proof_signed_batch: one shared Noir source, accepting exactly [-128, 128)."""
+import functools
+import os
+import subprocess
+
+import numpy as np
+import pytest
+
+import benchmark_all
+import generate_audit
+from noir_snippets import RANGE_PROOF_SIGNED_BATCH
+from poseidon2_bn254 import BN254_P
+
+RANGE_CHECK_LINE = "(values[i] + 128).assert_max_bit_size::<8>();"
+
+
+CIRCUIT_NAMES = [variant[0] for variant in benchmark_all.VARIANTS] + ["rlwe_audit"]
+
+
+@functools.lru_cache(maxsize=1)
+def generated_circuits():
+    """{name: main.nr} for every circuit either generator emits."""
+    pk = [0] * benchmark_all.N
+    circuits = {name: gen_fn() if var_pk else gen_fn(pk, pk)
+                for name, gen_fn, _, var_pk in benchmark_all.VARIANTS}
+    circuits["rlwe_audit"], _ = generate_audit.generate_const_circuit(
+        np.zeros((generate_audit.MSG_SLOTS, generate_audit.N), dtype=np.int64),
+        np.zeros(2 * generate_audit.N, dtype=np.int64))
+    return circuits
+
+
+def test_shared_source_offsets_and_bounds_each_value():
+    body = RANGE_PROOF_SIGNED_BATCH.split("{", 1)[1]
+    assert body.count(RANGE_CHECK_LINE) == 1
+    assert "for i in 0..K {" in body
+
+
+@pytest.mark.parametrize("name", CIRCUIT_NAMES)
+def test_generators_emit_and_call_range_check(name):
+    main_nr = generated_circuits()[name]
+    assert main_nr.count(RANGE_PROOF_SIGNED_BATCH) == 1
+    assert main_nr.count(RANGE_CHECK_LINE) == 1
+    assert "range_proof_signed_batch(r);" in main_nr
+    # e1 and e2 are checked too, whether taken as witnesses or computed in-circuit
+    assert main_nr.count("range_proof_signed_batch(") == 3
+
+
+@pytest.mark.skipif(not os.path.exists(benchmark_all.NARGO), reason="nargo not installed")
+@pytest.mark.parametrize("values, ok", [
+    ([-128, -1, 0, 127], True),
+    ([0, 0, 0, 128], False),
+    ([-129, 0, 0, 0], False),
+])
+def test_nargo_execute_accepts_only_in_range(tmp_path, values, ok):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "Nargo.toml").write_text(
+        '[package]\nname = "range_proof_test"\ntype = "bin"\nauthors = [""]\n\n[dependencies]\n')
+    (tmp_path / "src" / "main.nr").write_text(
+        RANGE_PROOF_SIGNED_BATCH + "\nfn main(x: [Field; 4]) {\n    range_proof_signed_batch(x);\n}\n")
+    (tmp_path / "Prover.toml").write_text("x = [" + ", ".join(f'"{v % BN254_P}"' for v in values) + "]\n")
+    result = subprocess.run([benchmark_all.NARGO, "execute"], cwd=tmp_path, capture_output=True, text=True)
+    assert (result.returncode == 0) == ok, result.stdout + result.stderr
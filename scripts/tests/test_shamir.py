@@ -0,0 +1,19 @@
+"""Shamir sharing over BN254: any threshold of shares recover each secret."""
+import itertools
+import random
+
+from shamir import BN254_P, lagrange_basis_at_zero, shamir_reconstruct_field, shamir_share_fields
+
+
+def test_any_threshold_subset_reconstructs():
+    secrets = [0, 1, 3, BN254_P - 3, 123456789]  # BN254_P - 3 is the field encoding of -3
+    all_shares = shamir_share_fields(secrets, 2, 3, random.Random(7))
+    for pair in itertools.combinations(all_shares, 2):
+        for coeff_idx, secret in enumerate(secrets):
+            assert shamir_reconstruct_field([share[coeff_idx] for share in pair], 2) == secret
+
+
+def test_lagrange_basis_sums_to_one():
+    # Interpolating the constant polynomial 1 at x = 0 gives 1
+    for xs in ([1, 2], [1, 3], [2, 3], [1, 2, 3]):
+        assert sum(lagrange_basis_at_zero(xs)) % BN254_P == 1